@@ -0,0 +1,84 @@
+"""Compare the former ``lexical_overlap`` scorer with cached BM25.
+
+Usage::
+
+    python benchmarks/bench_bm25.py [--docs 500] [--queries 20]
+
+Scores the same candidate set for several queries, the way repeated searches
+over overlapping SERP results do, and reports time per query for each scorer.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.bm25 import BM25Scorer, tokenize  # noqa: E402
+from src.modules.extractors import get_extractor  # noqa: E402
+
+
+def lexical_overlap(query: str, text: str) -> float:
+    """The query-term overlap ratio ranking used before BM25, kept as the baseline."""
+    query_terms = set(re.findall(r"[A-Za-z0-9]+", query.lower()))
+    text_terms = set(re.findall(r"[A-Za-z0-9]+", text.lower()))
+    if not query_terms or not text_terms:
+        return 0.0
+    intersect = query_terms.intersection(text_terms)
+    return float(len(intersect) / len(query_terms))
+
+
+def build_corpus(size: int) -> tuple:
+    extractor = get_extractor("bs4")
+    base = []
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "*.html"))):
+        with open(path, "r", encoding="utf-8") as handle:
+            base.append(extractor.extract(handle.read(), "https://example.com/")["text"])
+    vocabulary = sorted({token for text in base for token in tokenize(text)})
+    rng = random.Random(0)
+    corpus = []
+    for idx in range(size):
+        words = rng.choices(vocabulary, k=rng.randint(200, 1500))
+        corpus.append(base[idx % len(base)] + " " + " ".join(words))
+    return corpus, vocabulary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus, vocabulary = build_corpus(args.docs)
+    rng = random.Random(1)
+    queries = [" ".join(rng.choices(vocabulary, k=3)) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    for query in queries:
+        [lexical_overlap(query, text) for text in corpus]
+    lexical = (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    BM25Scorer(corpus).score(queries[0])
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        BM25Scorer(corpus).score(query)
+    warm = (time.perf_counter() - start) / len(queries)
+
+    print(f"{args.docs} documents, {args.queries} queries")
+    print(f"{'scorer':<28}{'ms/query':>10}")
+    print(f"{'lexical_overlap':<28}{lexical * 1000:>10.2f}")
+    print(f"{'bm25 (cold tokenize)':<28}{cold * 1000:>10.2f}")
+    print(f"{'bm25 (cached tokens)':<28}{warm * 1000:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
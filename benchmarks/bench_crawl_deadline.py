@@ -0,0 +1,71 @@
+"""Check that a host which never answers trips the circuit breaker.
+
+Usage::
+
+    python benchmarks/bench_crawl_deadline.py [--searches 4] [--deadline 1.5]
+
+Starts a local server that accepts connections and never replies, then runs
+repeated crawls against it with a short HTTP timeout and crawl deadline, the
+way consecutive searches hit a hanging host. Reports the time each crawl
+spent on the host and fails unless the host ends up in
+``breaker.open_hosts()`` and later crawls skip it instead of waiting.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Scaled-down timings; must be set before the crawler modules are imported.
+os.environ.setdefault("QUERYNOVA_HTTP_TIMEOUT", "1")
+os.environ.setdefault("QUERYNOVA_RESPECT_ROBOTS", "false")
+os.environ.setdefault("QUERYNOVA_HTTP_CACHE_PATH", os.path.join("/tmp", "querynova_bench_http_cache.db"))
+
+from src.modules.crawl import crawl_pages  # noqa: E402
+from src.modules.scheduler import breaker, host_of  # noqa: E402
+
+
+async def _hang(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        await reader.read()
+    finally:
+        writer.close()
+
+
+async def run(searches: int, deadline: float) -> int:
+    server = await asyncio.start_server(_hang, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/slow"
+    statuses = []
+    print(f"{'search':<8}{'seconds':>10}  status")
+    try:
+        for search in range(1, searches + 1):
+            events = []
+            start = time.perf_counter()
+            await crawl_pages([url], progress_handler=events.append, deadline=deadline)
+            elapsed = time.perf_counter() - start
+            final = events[-1]["status"] if events else "none"
+            statuses.append(final)
+            print(f"{search:<8}{elapsed:>10.2f}  {final}")
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    opened = host_of(url) in breaker.open_hosts()
+    print(f"breaker open for {host_of(url)}: {opened}")
+    return 0 if opened and statuses[-1] == "skipped" else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--searches", type=int, default=4)
+    parser.add_argument("--deadline", type=float, default=1.5)
+    args = parser.parse_args()
+    return asyncio.run(run(args.searches, args.deadline))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
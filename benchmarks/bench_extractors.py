@@ -0,0 +1,90 @@
+"""Compare HTML extraction backends on the saved fixture corpus.
+
+Usage::
+
+    python benchmarks/bench_extractors.py [--rounds 50] [--fixtures benchmarks/fixtures]
+
+Reports pages/second and peak traced memory per backend, and fails if any
+backend's output differs from the BeautifulSoup reference.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.extractors import available_extractors, get_extractor  # noqa: E402
+
+_BASE_URL = "https://example.com/articles/page.html"
+
+
+def load_corpus(directory: str) -> List[Tuple[str, str]]:
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+            corpus.append((os.path.basename(path), handle.read()))
+    return corpus
+
+
+def check_parity(corpus: List[Tuple[str, str]], backends: List[str]) -> List[str]:
+    reference = get_extractor("bs4")
+    mismatches = []
+    for name, html in corpus:
+        expected = reference.extract(html, _BASE_URL)
+        for backend in backends:
+            if get_extractor(backend).extract(html, _BASE_URL) != expected:
+                mismatches.append(f"{backend}: {name}")
+    return mismatches
+
+
+def measure(backend: str, corpus: List[Tuple[str, str]], rounds: int) -> Dict[str, float]:
+    extractor = get_extractor(backend)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for _, html in corpus:
+            extractor.extract(html, _BASE_URL)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _, html in corpus:
+        extractor.extract(html, _BASE_URL)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "pages_per_second": (rounds * len(corpus)) / elapsed if elapsed else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.fixtures)
+    if not corpus:
+        print(f"No fixtures found in {args.fixtures}")
+        return 1
+    backends = available_extractors()
+
+    mismatches = check_parity(corpus, backends)
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+
+    print(f"{len(corpus)} fixtures x {args.rounds} rounds")
+    print(f"{'backend':<12}{'pages/s':>12}{'peak KiB':>12}")
+    for backend in backends:
+        stats = measure(backend, corpus, args.rounds)
+        print(f"{backend:<12}{stats['pages_per_second']:>12.1f}{stats['peak_kib']:>12.1f}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Measure the per-call overhead saved by pooling Gemini model handles.
+
+Usage::
+
+    python benchmarks/bench_model_pool.py [--calls 2000]
+
+Compares building a ``GenerativeModel`` for every request (the old
+``generate_text`` behaviour) with fetching the pooled handle from
+``AIProvider``. No requests are sent, so no API key or network is needed;
+``google-generativeai`` must be installed.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.ai_provider import TEXT_MODEL, AIProvider  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    try:
+        import google.generativeai as genai
+    except ImportError:
+        print("google-generativeai is not installed", file=sys.stderr)
+        return 1
+    genai.configure(api_key="benchmark-not-used")
+    provider = AIProvider()
+    provider.client = genai
+    config = {"temperature": 0.7, "max_output_tokens": 180}
+
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        genai.GenerativeModel(TEXT_MODEL, generation_config=config)
+    fresh = (time.perf_counter() - start) / args.calls
+
+    provider._model(TEXT_MODEL, 180, 0.7)
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        provider._model(TEXT_MODEL, 180, 0.7)
+    pooled = (time.perf_counter() - start) / args.calls
+
+    print(f"{args.calls} calls, model {TEXT_MODEL}")
+    print(f"{'handle':<24}{'us/call':>10}")
+    print(f"{'new GenerativeModel':<24}{fresh * 1e6:>10.1f}")
+    print(f"{'pooled':<24}{pooled * 1e6:>10.1f}")
+    print(f"{'saved per call':<24}{(fresh - pooled) * 1e6:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
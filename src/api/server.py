@@ -1,7 +1,7 @@
 """Flask API exposing QueryNova services."""
 from __future__ import annotations
 
-import asyncio
+import atexit
 import json
 from datetime import datetime, timezone
 from typing import Any, Dict
@@ -10,14 +10,21 @@ from celery.result import AsyncResult
 from flask import Flask, jsonify, request
 from flask_socketio import SocketIO
 
+from src.modules import parser_pool
+from src.plugins.registry import registry
 from src.services.search_service import SearchOptions, SearchPayload, SearchService
 from src.tasks.jobs import enqueue_search
+from src.utils import ai_provider, http_client
 from src.utils.logger import logger
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "querynova-secret"
 socketio = SocketIO(app, cors_allowed_origins="*")
 service = SearchService()
+atexit.register(http_client.shutdown)
+atexit.register(parser_pool.shutdown)
+atexit.register(registry.shutdown)
+atexit.register(ai_provider.shutdown)
 
 
 @app.route("/api/health")
@@ -42,7 +49,7 @@ def trigger_search() -> Any:
     def _progress(stage: str, meta: Dict[str, Any]) -> None:
         socketio.emit("search_progress", {"stage": stage, "meta": meta})
 
-    result = asyncio.run(service.run(SearchPayload(query=query, options=options), progress=_progress))
+    result = http_client.run_sync(service.run(SearchPayload(query=query, options=options), progress=_progress))
     return jsonify(result)
 
 
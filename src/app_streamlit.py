@@ -4,7 +4,6 @@ Modern Streamlit Cloud-Ready Application
 """
 from __future__ import annotations
 
-import asyncio
 import json
 import os
 import sys
@@ -22,6 +21,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from services.knowledge_base import KnowledgeBase
 from services.search_service import SearchOptions, SearchPayload, SearchService
 from utils import cache
+from utils.http_client import run_sync
 from utils.logger import logger
 
 # ============================================================================
@@ -507,17 +507,8 @@ def run_search(query: str, options: SearchOptions) -> Dict[str, Any]:
     payload = SearchPayload(query=query, options=options)
     
     try:
-        # Handle async in Streamlit
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
-            service.run(payload, progress=progress_callback)
-        )
-        return result
+        # Persistent per-thread loop so the crawler's connection pool survives reruns
+        return run_sync(service.run(payload, progress=progress_callback))
         
     except Exception as exc:
         logger.exception("Search failed")
@@ -1,103 +1,372 @@
+import asyncio
+import os
 import re
-from typing import Any, Dict, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 import numpy as np
-from urllib.parse import urlparse
 
+from src.modules.bm25 import BM25Scorer
+from src.modules.reliability import domain_reliability, get_index as reliability_index
+from src.utils import embedding_cache
 from src.utils.logger import logger
-from src.utils.ai_provider import get_ai_provider
+from src.utils.ai_provider import DEFAULT_EMBEDDING_TASK, EMBEDDING_MODEL, get_ai_provider
+from src.utils.local_embeddings import get_local_embedder
+
+# "provider" (Gemini only), "local" (offline scikit-learn backend) or "auto"
+# (provider when configured and reachable, otherwise local).
+EMBEDDING_BACKEND = os.getenv("QUERYNOVA_EMBEDDING_BACKEND", "auto").lower()
 
 
 def get_embedding(text: str) -> Iterable[float]:
     """Get text embedding using the configured AI provider (Gemini or OpenAI)."""
-    provider = get_ai_provider()
-    embedding = provider.get_embedding(text)
-    if embedding:
-        return embedding
+    if EMBEDDING_BACKEND != "local":
+        cached = _cache_lookup([text])[0]
+        if cached is not None:
+            return cached.tolist()
+        provider = get_ai_provider()
+        embedding = provider.get_embedding(text)
+        if embedding:
+            _cache_store([text], [embedding])
+            return embedding
+    if EMBEDDING_BACKEND != "provider":
+        local = _local_vectors([text])[0]
+        if local is not None:
+            return local.tolist()
     # Fallback to empty embedding
     logger.warning("No embedding available, using fallback")
     return [0.0] * 384  # Default embedding size
 
 
-def cosine_similarity(a: Iterable[float], b: Iterable[float]) -> float:
-    vec_a = np.array(list(a))
-    vec_b = np.array(list(b))
-    denom = np.linalg.norm(vec_a) * np.linalg.norm(vec_b)
-    if not denom:
-        return 0.0
-    return float(np.dot(vec_a, vec_b) / denom)
+def get_embeddings(texts: Sequence[str]) -> List[List[float]]:
+    """Embed ``texts`` in batched provider calls; blank or failed entries become empty lists."""
+    return [vector.tolist() if vector is not None else [] for vector in embed_vectors(texts)]
+
+
+def embed_vectors(texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+    """Like :func:`get_embeddings` but returns float32 arrays (``None`` when unavailable).
+
+    All vectors of one call come from a single backend so they are comparable.
+    In ``auto`` mode the whole call switches to the local backend as soon as
+    the provider leaves any non-blank text unembedded; a warm cache must not
+    hide a provider outage behind a query vector that is missing.
+    """
+    if EMBEDDING_BACKEND == "local":
+        return _local_vectors(texts)
+    results = _provider_vectors(texts)
+    if EMBEDDING_BACKEND == "auto" and any(results[idx] is None for idx, text in enumerate(texts) if text.strip()):
+        local = _local_vectors(texts)
+        if any(vector is not None for vector in local):
+            return local
+    return results
+
+
+def _local_vectors(texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+    embedder = get_local_embedder()
+    results: List[Optional[np.ndarray]] = [None] * len(texts)
+    pending = [idx for idx, text in enumerate(texts) if text.strip()]
+    if embedder is None or not pending:
+        return results
+    matrix = embedder.embed([texts[idx] for idx in pending])
+    for idx, row in zip(pending, matrix):
+        results[idx] = row
+    return results
+
+
+def _provider_vectors(texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+    results: List[Optional[np.ndarray]] = [None] * len(texts)
+    pending = [idx for idx, text in enumerate(texts) if text.strip()]
+    if not pending:
+        return results
+    cached = _cache_lookup([texts[idx] for idx in pending])
+    missing = []
+    for idx, vector in zip(pending, cached):
+        if vector is not None:
+            results[idx] = vector
+        else:
+            missing.append(idx)
+    if not missing:
+        return results
+    provider = get_ai_provider()
+    if not provider.is_available():
+        return results
+    embeddings = provider.get_embeddings([texts[idx] for idx in missing])
+    if not any(embeddings):
+        logger.warning("Provider embeddings unavailable")
+    for idx, embedding in zip(missing, embeddings):
+        if embedding:
+            results[idx] = np.asarray(embedding, dtype=np.float32)
+    _cache_store([texts[idx] for idx in missing], embeddings)
+    return results
+
+
+def embedding_matrix(vectors: Sequence[Optional[np.ndarray]], dim: Optional[int] = None) -> tuple[np.ndarray, np.ndarray]:
+    """Stack vectors into an L2-normalized float32 matrix.
+
+    Returns ``(matrix, mask)`` where rows without a usable vector (missing,
+    zero-norm or of a different dimension) are zero and ``mask`` is False.
+    """
+    if dim is None:
+        dim = next((len(vector) for vector in vectors if vector is not None and len(vector)), 0)
+    matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+    mask = np.zeros(len(vectors), dtype=bool)
+    for row, vector in enumerate(vectors):
+        if vector is not None and len(vector) == dim and dim:
+            matrix[row] = vector
+            mask[row] = True
+    norms = np.linalg.norm(matrix, axis=1)
+    mask &= norms > 0
+    matrix[mask] /= norms[mask, None]
+    return matrix, mask
+
+
+def similarity_scores(query_vector: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity of a normalized query against every row of a normalized matrix."""
+    return matrix @ query_vector
+
+
+def _cache_lookup(texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+    try:
+        return embedding_cache.lookup_many(EMBEDDING_MODEL, DEFAULT_EMBEDDING_TASK, texts)
+    except Exception as exc:
+        logger.warning("Embedding cache lookup failed: %s", exc)
+        return [None] * len(texts)
+
+
+def _cache_store(texts: Sequence[str], embeddings: Sequence[Optional[Sequence[float]]]) -> None:
+    try:
+        embedding_cache.store_many(EMBEDDING_MODEL, DEFAULT_EMBEDDING_TASK, texts, embeddings)
+    except Exception as exc:
+        logger.warning("Embedding cache store failed: %s", exc)
+
+
+SUMMARY_TOP_K = 5
+SUMMARY_CONCURRENCY = 4
+_SUMMARY_PROMPT = "Produce a two sentence summary and one actionable insight."
+
+
+@dataclass
+class RankingConfig:
+    """Weights and candidate limits for :func:`rank_pages_async`.
+
+    Pages are split into overlapping passages of ``passage_words`` words
+    (at most ``max_passages`` per page) and scored per passage. A page's
+    relevance is the ``aggregation`` (``"max"`` or ``"top_k_mean"`` over
+    ``aggregation_k`` passages) of its passage scores.
+
+    ``mode="two_stage"`` scores every passage with BM25 and embeds only the
+    ``passages_per_page`` best passages of the ``rerank_top_n`` best pages;
+    passage relevance is then ``semantic_weight * cosine + lexical_weight *
+    bm25`` (weights renormalized to sum to one). ``mode="embedding"`` embeds
+    the best passages of every page and uses cosine alone, with BM25 only
+    for passages that were not embedded. The final score is
+    ``(1 - reliability_weight) * relevance + reliability_weight * reliability``.
+    """
+
+    mode: str = "two_stage"
+    rerank_top_n: int = 20
+    semantic_weight: float = 0.8
+    lexical_weight: float = 0.2
+    reliability_weight: float = 0.3
+    passage_words: int = 120
+    passage_overlap: int = 30
+    max_passages: int = 64
+    passages_per_page: int = 3
+    aggregation: str = "max"
+    aggregation_k: int = 2
+    highlights: int = 2
 
 
-def rank_pages(query: str, pages: Iterable[Dict[str, Any]], knowledge_base: Optional[Any] = None) -> Iterable[Dict[str, Any]]:
+def split_passages(text: str, words: int = 120, overlap: int = 30, limit: int = 64) -> List[str]:
+    """Split ``text`` into overlapping windows of ``words`` words."""
+    tokens = text.split()
+    if not tokens:
+        return []
+    step = max(words - overlap, 1)
+    passages = []
+    for start in range(0, len(tokens), step):
+        passages.append(" ".join(tokens[start:start + words]))
+        if start + words >= len(tokens) or len(passages) >= limit:
+            break
+    return passages
+
+
+def rank_pages(
+    query: str,
+    pages: Iterable[Dict[str, Any]],
+    knowledge_base: Optional[Any] = None,
+    summary_top_k: int = SUMMARY_TOP_K,
+    summary_concurrency: int = SUMMARY_CONCURRENCY,
+    config: Optional[RankingConfig] = None,
+) -> Iterable[Dict[str, Any]]:
+    """Synchronous wrapper around :func:`rank_pages_async`."""
+    coro = rank_pages_async(
+        query,
+        pages,
+        knowledge_base=knowledge_base,
+        summary_top_k=summary_top_k,
+        summary_concurrency=summary_concurrency,
+        config=config,
+    )
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Called from inside a running loop: run on a private loop in a worker thread.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+async def rank_pages_async(
+    query: str,
+    pages: Iterable[Dict[str, Any]],
+    knowledge_base: Optional[Any] = None,
+    summary_top_k: int = SUMMARY_TOP_K,
+    summary_concurrency: int = SUMMARY_CONCURRENCY,
+    config: Optional[RankingConfig] = None,
+) -> List[Dict[str, Any]]:
+    """Score and order ``pages`` for ``query`` without blocking the event loop.
+
+    Provider calls run off the loop; only the ``summary_top_k`` best pages get
+    an LLM summary, at most ``summary_concurrency`` at a time, once ranking is
+    final. The rest use the extractive fallback. Cancelling the task stops
+    any summaries that have not started yet.
+    """
     pages = list(pages)
     if not pages:
         return []
 
-    try:
-        query_emb = list(get_embedding(query))
-    except Exception as exc:
-        logger.warning("Embedding failed for query: %s", exc)
-        query_emb = []
+    config = config or RankingConfig()
+    texts = [(page.get("text") or "")[:4000] for page in pages]
+    passages: List[str] = []
+    owner_list: List[int] = []
+    for idx, page in enumerate(pages):
+        for passage in split_passages(page.get("text") or "", config.passage_words, config.passage_overlap, config.max_passages):
+            passages.append(passage)
+            owner_list.append(idx)
+    owners = np.array(owner_list, dtype=np.int64)
 
-    ranked = []
-    for page in pages:
-        text = (page.get("text") or "")[:4000]
+    passage_lexical = BM25Scorer(passages).score(query)
+    lexical = _aggregate(passage_lexical, owners, len(pages), config)
+    if config.mode == "two_stage":
+        candidates = np.argsort(-lexical, kind="stable")[:max(config.rerank_top_n, 0)]
+    else:
+        candidates = np.arange(len(pages))
+    chosen = _best_passages(passage_lexical, owners, candidates, config.passages_per_page)
+
+    vectors: List[Optional[np.ndarray]] = [None] * (len(passages) + 1)
+    if len(chosen):
         try:
-            emb = list(get_embedding(text)) if query_emb else []
-            score = cosine_similarity(query_emb, emb) if query_emb and emb else lexical_overlap(query, text)
+            embedded = await asyncio.to_thread(embed_vectors, [query] + [passages[idx] for idx in chosen])
         except Exception as exc:
-            logger.warning("Embedding failed for page %s: %s", page.get("url"), exc)
-            score = lexical_overlap(query, text)
+            logger.warning("Batch embedding failed: %s", exc)
+        else:
+            vectors[0] = embedded[0]
+            for idx, vector in zip(chosen, embedded[1:]):
+                vectors[idx + 1] = vector
+    passage_scores = _score_passages(vectors, passage_lexical, config)
+    # The first load of a large reliability list must not run on the loop.
+    await asyncio.to_thread(reliability_index)
+    combined, reliability = _score_pages(pages, _aggregate(passage_scores, owners, len(pages), config), config)
+    order = np.argsort(-combined, kind="stable")
 
-        reliability = domain_reliability(page.get("url", ""))
-        combined = min(max((score * 0.7) + (reliability * 0.3), 0.0), 1.0)
-        summary, insight = summarize_passage(text)
+    if knowledge_base and knowledge_base.has_documents:
+        top_snippets = await asyncio.to_thread(knowledge_base.get_top_snippets, query, 1)
+    else:
+        top_snippets = []
 
-        if knowledge_base and knowledge_base.has_documents:
-            top_snippets = knowledge_base.get_top_snippets(query, limit=1)
-        else:
-            top_snippets = []
+    summaries = await _summarize_top(texts, order[:max(summary_top_k, 0)], summary_concurrency)
 
+    ranked = []
+    for idx in order:
+        page = pages[idx]
+        summary, insight = summaries.get(idx) or _extractive_summary(texts[idx])
+        best = _best_passages(passage_scores, owners, [idx], config.highlights)
         ranked.append(
             {
                 "url": page.get("url"),
                 "title": page.get("title") or page.get("url"),
                 "summary": summary,
                 "insight": insight,
-                "score": combined,
-                "reliability": reliability,
-                "snippets": top_snippets,
+                "score": float(combined[idx]),
+                "reliability": float(reliability[idx]),
+                "snippets": list(top_snippets),
+                "highlights": [passages[passage] for passage in best],
+                "alternates": page.get("alternates", []),
             }
         )
-
-    ranked.sort(key=lambda item: item.get("score", 0), reverse=True)
     return ranked
 
 
-def lexical_overlap(query: str, text: str) -> float:
-    query_terms = set(re.findall(r"[A-Za-z0-9]+", query.lower()))
-    text_terms = set(re.findall(r"[A-Za-z0-9]+", text.lower()))
-    if not query_terms or not text_terms:
-        return 0.0
-    intersect = query_terms.intersection(text_terms)
-    return float(len(intersect) / len(query_terms))
-
-
-def domain_reliability(url: str) -> float:
-    if not url:
-        return 0.2
-    domain = urlparse(url).netloc.lower()
-    tiers = {
-        "edu": 0.95,
-        "gov": 0.9,
-        "org": 0.8,
-        "news": 0.75,
-        "blog": 0.55,
-    }
-    for key, value in tiers.items():
-        if domain.endswith(key):
-            return value
-    return 0.6
+def _best_passages(scores: np.ndarray, owners: np.ndarray, pages: Iterable[int], per_page: int) -> List[int]:
+    """Indices of the ``per_page`` highest-scoring passages of each page in ``pages``."""
+    chosen: List[int] = []
+    if per_page <= 0:
+        return chosen
+    for page in pages:
+        members = np.flatnonzero(owners == page)
+        if len(members):
+            best = members[np.argsort(-scores[members], kind="stable")[:per_page]]
+            chosen.extend(int(idx) for idx in best)
+    return chosen
+
+
+def _aggregate(scores: np.ndarray, owners: np.ndarray, count: int, config: RankingConfig) -> np.ndarray:
+    """Collapse passage scores to one score per page."""
+    result = np.zeros(count, dtype=np.float64)
+    if not len(scores):
+        return result
+    if config.aggregation == "top_k_mean":
+        for page in np.unique(owners):
+            values = np.sort(scores[owners == page])[::-1][:max(config.aggregation_k, 1)]
+            result[page] = values.mean()
+        return result
+    np.maximum.at(result, owners, scores)
+    return result
+
+
+def _score_passages(
+    vectors: Sequence[Optional[np.ndarray]],
+    lexical: np.ndarray,
+    config: RankingConfig,
+) -> np.ndarray:
+    matrix, mask = embedding_matrix(vectors)
+    if not mask[0]:
+        return lexical
+    semantic = np.zeros(len(lexical), dtype=np.float64)
+    passage_mask = mask[1:]
+    if passage_mask.any():
+        semantic[passage_mask] = similarity_scores(matrix[0], matrix[1:][passage_mask])
+    if config.mode == "two_stage":
+        total = (config.semantic_weight + config.lexical_weight) or 1.0
+        return (config.semantic_weight * semantic + config.lexical_weight * lexical) / total
+    return np.where(passage_mask, semantic, lexical)
+
+
+def _score_pages(
+    pages: List[Dict[str, Any]],
+    relevance: np.ndarray,
+    config: RankingConfig,
+) -> tuple[np.ndarray, np.ndarray]:
+    reliability = np.fromiter((domain_reliability(page.get("url", "")) for page in pages), dtype=np.float64, count=len(pages))
+    weight = config.reliability_weight
+    combined = np.clip(relevance * (1.0 - weight) + reliability * weight, 0.0, 1.0)
+    return combined, reliability
+
+
+async def _summarize_top(texts: List[str], indices: Iterable[int], concurrency: int) -> Dict[int, tuple[str, str]]:
+    indices = [int(idx) for idx in indices]
+    if not indices:
+        return {}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(idx: int) -> tuple[str, str]:
+        async with semaphore:
+            return await summarize_passage_async(texts[idx])
+
+    results = await asyncio.gather(*(_one(idx) for idx in indices))
+    return dict(zip(indices, results))
 
 
 def summarize_passage(text: str) -> tuple[str, str]:
@@ -113,22 +382,57 @@ def summarize_passage(text: str) -> tuple[str, str]:
     try:
         summary_text = provider.generate_text(
             prompt=shortened,
-            system_prompt="Produce a two sentence summary and one actionable insight.",
-            max_tokens=180
+            system_prompt=_SUMMARY_PROMPT,
+            max_tokens=180,
+            cache=True,
+            task="summary",
         )
-        
-        if not summary_text:
-            return _fallback_summary(shortened)
-        
-        summary_lines = [line.strip() for line in summary_text.split("\n") if line.strip()]
-        summary = summary_lines[0] if summary_lines else summary_text[:280]
-        insight = summary_lines[1] if len(summary_lines) > 1 else ""
-        return summary, insight
+        return _parse_summary(summary_text, shortened)
     except Exception as exc:
         logger.warning("LLM summary fallback: %s", exc)
         return _fallback_summary(shortened)
 
 
+async def summarize_passage_async(text: str) -> tuple[str, str]:
+    """Async variant of :func:`summarize_passage` using the provider's shared budget."""
+    shortened = text[:1500]
+    if not shortened.strip():
+        return "No content available.", ""
+
+    provider = get_ai_provider()
+    if not provider.is_available():
+        return _fallback_summary(shortened)
+
+    try:
+        summary_text = await provider.generate_text_async(
+            prompt=shortened,
+            system_prompt=_SUMMARY_PROMPT,
+            max_tokens=180,
+            cache=True,
+            task="summary",
+        )
+        return _parse_summary(summary_text, shortened)
+    except Exception as exc:
+        logger.warning("LLM summary fallback: %s", exc)
+        return _fallback_summary(shortened)
+
+
+def _parse_summary(summary_text: Optional[str], shortened: str) -> tuple[str, str]:
+    if not summary_text:
+        return _fallback_summary(shortened)
+    summary_lines = [line.strip() for line in summary_text.split("\n") if line.strip()]
+    summary = summary_lines[0] if summary_lines else summary_text[:280]
+    insight = summary_lines[1] if len(summary_lines) > 1 else ""
+    return summary, insight
+
+
+def _extractive_summary(text: str) -> tuple[str, str]:
+    shortened = text[:1500]
+    if not shortened.strip():
+        return "No content available.", ""
+    return _fallback_summary(shortened)
+
+
 def _fallback_summary(text: str) -> tuple[str, str]:
     sentences = re.split(r"(?<=[.!?]) +", text)
     summary = " ".join(sentences[:2])
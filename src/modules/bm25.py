@@ -0,0 +1,83 @@
+"""BM25 lexical scoring with tokenization cached by content hash."""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+_CACHE_SIZE = 4096
+_TOKEN_CACHE: "OrderedDict[bytes, Tuple[Dict[str, int], int]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def term_frequencies(text: str) -> Tuple[Dict[str, int], int]:
+    """Return ``(term counts, document length)``, cached by a hash of ``text``."""
+    key = hashlib.blake2b(text.encode("utf-8", errors="ignore"), digest_size=16).digest()
+    with _CACHE_LOCK:
+        cached = _TOKEN_CACHE.get(key)
+        if cached is not None:
+            _TOKEN_CACHE.move_to_end(key)
+            return cached
+    tokens = tokenize(text)
+    entry = (dict(Counter(tokens)), len(tokens))
+    with _CACHE_LOCK:
+        _TOKEN_CACHE[key] = entry
+        while len(_TOKEN_CACHE) > _CACHE_SIZE:
+            _TOKEN_CACHE.popitem(last=False)
+    return entry
+
+
+class BM25Scorer:
+    """Okapi BM25 over a fixed candidate set.
+
+    Each document is tokenized once (and reused across searches through the
+    content-hash cache); term statistics are computed over the candidates
+    passed to the constructor. :meth:`score` returns values normalized by the
+    query's maximum attainable score, so results fall in ``[0, 1]`` and can be
+    blended with cosine similarities.
+    """
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._docs = [term_frequencies(doc) for doc in documents]
+        self._lengths = np.array([length for _, length in self._docs], dtype=np.float64)
+        self._avgdl = float(self._lengths.mean()) if len(self._docs) and self._lengths.sum() else 1.0
+        self._df: Counter = Counter()
+        for counts, _ in self._docs:
+            self._df.update(counts.keys())
+
+    def idf(self, term: str) -> float:
+        n = len(self._docs)
+        df = self._df.get(term, 0)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def score(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self._docs), dtype=np.float64)
+        terms = set(tokenize(query))
+        if not terms or not self._docs:
+            return scores
+        norm = self.k1 * (1.0 - self.b + self.b * self._lengths / self._avgdl)
+        ceiling = 0.0
+        for term in terms:
+            idf = self.idf(term)
+            ceiling += idf * (self.k1 + 1.0)
+            if not self._df.get(term):
+                continue
+            tf = np.fromiter((counts.get(term, 0) for counts, _ in self._docs), dtype=np.float64, count=len(self._docs))
+            scores += idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return scores / ceiling if ceiling else scores
+
+
+def bm25_scores(query: str, documents: Sequence[str]) -> np.ndarray:
+    return BM25Scorer(documents).score(query)
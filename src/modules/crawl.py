@@ -1,85 +1,313 @@
 import asyncio
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import Any, Callable, Dict, Iterable, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
 
 import httpx
-from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_exponential
-from urllib.parse import urljoin
+from tenacity import RetryCallState, retry, retry_if_exception, stop_after_attempt, wait_exponential
 
+from src.modules import parser_pool
+from src.modules.extractors import get_extractor
+from src.modules.scheduler import CrawlScheduler, breaker
 from src.plugins.registry import registry
+from src.utils import http_cache
+from src.utils.http_client import get_client
 from src.utils.logger import logger
+from src.utils.page_cache import PageCache
+from src.utils.singleflight import SingleFlight
 
 Progress = Callable[[Dict[str, Any]], None]
 
-_CACHE: Dict[str, Dict[str, Any]] = {}
+_CACHE = PageCache()
+_INFLIGHT = SingleFlight()
 
+_MAX_BODY_BYTES = int(os.getenv("QUERYNOVA_CRAWL_MAX_BYTES", str(2 * 1024 * 1024)))
+_TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "application/xml", "text/xml")
 
-async def crawl_pages(urls: Iterable[str], progress_handler: Optional[Progress] = None) -> List[Dict[str, Any]]:
-    semaphore = asyncio.Semaphore(8)
-    async with httpx.AsyncClient(follow_redirects=True, timeout=15) as client:
-        tasks = [
-            _crawl_single(url, client, semaphore, progress_handler)
-            for url in urls
-        ]
+# URLs with a network fetch in progress. A deadline that cancels one of them
+# counts against the host's circuit breaker, since a hanging host never
+# reaches the failure path on its own before the deadline.
+_FETCHING: Counter = Counter()
+_FETCHING_LOCK = threading.Lock()
+
+
+@dataclass
+class FetchResult:
+    status_code: int
+    text: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+    content_type: str = ""
+    bytes_read: int = 0
+    truncated: bool = False
+    skipped: bool = False
+
+
+async def crawl_pages(
+    urls: Iterable[str],
+    progress_handler: Optional[Progress] = None,
+    scheduler: Optional[CrawlScheduler] = None,
+    parse_workers: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Crawl ``urls`` and return pages in input order.
+
+    With a ``deadline`` (seconds), only the pages finished in time are
+    returned; the rest are cancelled and reported as ``timeout``.
+    """
+    tasks = _start_crawl(urls, progress_handler, scheduler, parse_workers)
+    if deadline is None:
         return await asyncio.gather(*tasks)
+    done, pending = await asyncio.wait(tasks, timeout=deadline) if tasks else (set(), set())
+    _abandon(pending, progress_handler)
+    return [task.result() for task in tasks if task in done]
+
+
+async def iter_crawl_pages(
+    urls: Iterable[str],
+    progress_handler: Optional[Progress] = None,
+    scheduler: Optional[CrawlScheduler] = None,
+    parse_workers: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield pages in completion order so consumers can start on the first results.
+
+    Closing the generator early cancels any fetches still in flight. When the
+    ``deadline`` (seconds) passes, unfinished fetches are cancelled and
+    reported as ``timeout``.
+    """
+    loop = asyncio.get_running_loop()
+    expires_at = loop.time() + deadline if deadline is not None else None
+    pending = set(_start_crawl(urls, progress_handler, scheduler, parse_workers))
+    try:
+        while pending:
+            timeout = None if expires_at is None else max(expires_at - loop.time(), 0.0)
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                _abandon(pending, progress_handler)
+                pending = set()
+                break
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _start_crawl(
+    urls: Iterable[str],
+    progress_handler: Optional[Progress],
+    scheduler: Optional[CrawlScheduler],
+    parse_workers: Optional[int],
+) -> List["asyncio.Task[Dict[str, Any]]"]:
+    parser_pool.configure(parse_workers)
+    scheduler = scheduler or CrawlScheduler()
+    client = get_client()
+    tasks = []
+    for url in urls:
+        task = asyncio.ensure_future(_crawl_single(url, client, scheduler, progress_handler))
+        task.crawl_url = url  # type: ignore[attr-defined]
+        tasks.append(task)
+    return tasks
+
+
+def _abandon(tasks: Iterable["asyncio.Task[Dict[str, Any]]"], progress_handler: Optional[Progress]) -> None:
+    for task in tasks:
+        task.cancel()
+        url = getattr(task, "crawl_url", None)
+        logger.warning("Crawl deadline exceeded for %s", url)
+        with _FETCHING_LOCK:
+            fetching = _FETCHING[url] > 0
+        if fetching:
+            breaker.record_failure(url)
+        if progress_handler:
+            progress_handler({"url": url, "status": "timeout"})
 
 
 async def _crawl_single(
     url: str,
     client: httpx.AsyncClient,
-    semaphore: asyncio.Semaphore,
+    scheduler: CrawlScheduler,
     progress_handler: Optional[Progress],
 ) -> Dict[str, Any]:
-    if url in _CACHE:
-        return _CACHE[url]
+    cached = _CACHE.get(url)
+    if cached is not None:
+        return cached
+    return await _INFLIGHT.do(url, lambda: _fetch_page(url, client, scheduler, progress_handler))
 
-    await semaphore.acquire()
-    try:
+
+async def _fetch_page(
+    url: str,
+    client: httpx.AsyncClient,
+    scheduler: CrawlScheduler,
+    progress_handler: Optional[Progress],
+) -> Dict[str, Any]:
+    if not breaker.allow(url):
+        logger.info("Skipping %s: circuit open for host", url)
+        if progress_handler:
+            progress_handler({"url": url, "status": "skipped", "reason": "circuit_open"})
+        return {"url": url, "title": url, "text": "", "links": [], "metadata": {"skipped": "circuit_open"}}
+
+    if not await scheduler.allowed(client, url):
+        logger.info("Skipping %s: disallowed by robots.txt", url)
+        if progress_handler:
+            progress_handler({"url": url, "status": "blocked", "reason": "robots"})
+        return {"url": url, "title": url, "text": "", "links": [], "metadata": {"skipped": "robots"}}
+
+    async with scheduler.slot(url):
         if progress_handler:
             progress_handler({"url": url, "status": "fetching"})
+        stored = await _lookup_http_cache(url)
+        headers = stored.conditional_headers() if stored else {}
+        with _FETCHING_LOCK:
+            _FETCHING[url] += 1
         try:
-            text = await _fetch_with_retry(client, url)
+            response = await _fetch_with_retry(client, url, headers)
         except Exception as exc:
             logger.error("Fetch failed for %s: %s", url, exc)
+            if _is_retryable(exc):
+                breaker.record_failure(url)
+            if progress_handler:
+                progress_handler({"url": url, "status": "failed"})
             return {"url": url, "title": url, "text": "", "links": []}
-        if progress_handler:
-            progress_handler({"url": url, "status": "parsing"})
-        try:
-            page = await _parse_and_extract(text, url)
-        except Exception as exc:
-            logger.error("Parse failed for %s: %s", url, exc)
-            page = {"url": url, "title": url, "text": text[:5000], "links": []}
-        for name, crawler in registry.crawlers.items():
+        finally:
+            with _FETCHING_LOCK:
+                _FETCHING[url] -= 1
+                if _FETCHING[url] <= 0:
+                    del _FETCHING[url]
+        breaker.record_success(url)
+        if response.skipped:
+            logger.info("Skipping %s: unsupported content type %s", url, response.content_type)
+            page = {
+                "url": url,
+                "title": url,
+                "text": "",
+                "links": [],
+                "metadata": {"skipped": "content_type", "content_type": response.content_type},
+            }
+            _CACHE.set(url, page)
+            if progress_handler:
+                progress_handler({"url": url, "status": "skipped", "reason": "content_type"})
+            return page
+        if stored and response.status_code == 304:
+            page = dict(stored.page)
             try:
-                extra = crawler(url)
-                page.setdefault("metadata", {}).setdefault("plugins", {})[name] = extra
+                await asyncio.to_thread(http_cache.touch, url)
             except Exception as exc:
-                logger.error("Plugin crawler failed (%s): %s", name, exc)
-        _CACHE[url] = page
-        if progress_handler:
-            progress_handler({"url": url, "status": "complete"})
-        return page
-    finally:
-        semaphore.release()
+                logger.warning("HTTP cache update failed for %s: %s", url, exc)
+        else:
+            text = response.text
+            if progress_handler:
+                progress_handler({"url": url, "status": "parsing"})
+            try:
+                page = await _parse_and_extract(text, url)
+            except Exception as exc:
+                logger.error("Parse failed for %s: %s", url, exc)
+                page = {"url": url, "title": url, "text": text[:5000], "links": []}
+            else:
+                if response.truncated:
+                    page.setdefault("metadata", {}).update({"truncated": True, "bytes_read": response.bytes_read})
+                await _store_http_cache(url, response, page)
+
+    plugins = await registry.run_crawlers(url)
+    if plugins:
+        page.setdefault("metadata", {}).setdefault("plugins", {}).update(plugins)
+    _CACHE.set(url, page)
+    if progress_handler:
+        progress_handler({"url": url, "status": "complete"})
+    return page
+
+
+def cache_stats() -> Dict[str, int]:
+    """Return hit/miss/eviction counters for the crawl page cache."""
+    return _CACHE.stats()
+
+
+def inflight_stats() -> Dict[str, int]:
+    """Return how many fetches ran and how many were saved by coalescing."""
+    return _INFLIGHT.stats()
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10))
-async def _fetch_with_retry(client: httpx.AsyncClient, url: str) -> str:
-    response = await client.get(url)
-    response.raise_for_status()
-    return response.text
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def _record_timeout(retry_state: RetryCallState) -> None:
+    # Each timed-out attempt counts, so a hanging host trips the breaker even
+    # when the crawl deadline cancels the fetch before retries are exhausted.
+    if isinstance(retry_state.outcome.exception(), httpx.TimeoutException):
+        breaker.record_failure(retry_state.args[1])
+
+
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    before_sleep=_record_timeout,
+    reraise=True,
+)
+async def _fetch_with_retry(client: httpx.AsyncClient, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+    """Stream ``url``, stopping early on unusable content types or past the byte cap."""
+    async with client.stream("GET", url, headers=headers) as response:
+        if response.status_code != 304:
+            response.raise_for_status()
+        content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        result = FetchResult(
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            content_type=content_type,
+        )
+        if response.status_code == 304:
+            return result
+        if content_type and not content_type.startswith(_TEXT_CONTENT_TYPES):
+            result.skipped = True
+            return result
+        declared = response.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > _MAX_BODY_BYTES:
+            result.truncated = True
+        chunks: List[bytes] = []
+        async for chunk in response.aiter_bytes():
+            remaining = _MAX_BODY_BYTES - result.bytes_read
+            if len(chunk) >= remaining:
+                chunks.append(chunk[:remaining])
+                result.bytes_read += remaining
+                result.truncated = result.truncated or len(chunk) > remaining
+                break
+            chunks.append(chunk)
+            result.bytes_read += len(chunk)
+        result.text = b"".join(chunks).decode(response.encoding or "utf-8", errors="replace")
+        return result
+
+
+async def _lookup_http_cache(url: str) -> Optional[http_cache.CachedResponse]:
+    try:
+        return await asyncio.to_thread(http_cache.lookup, url)
+    except Exception as exc:
+        logger.warning("HTTP cache lookup failed for %s: %s", url, exc)
+        return None
+
+
+async def _store_http_cache(url: str, response: FetchResult, page: Dict[str, Any]) -> None:
+    try:
+        await asyncio.to_thread(
+            http_cache.store,
+            url,
+            response.headers.get("etag"),
+            response.headers.get("last-modified"),
+            dict(page),
+        )
+    except Exception as exc:
+        logger.warning("HTTP cache store failed for %s: %s", url, exc)
 
 
 async def _parse_and_extract(text: str, base_url: str) -> Dict[str, Any]:
-    soup = BeautifulSoup(text, "html.parser")
-    title = soup.title.string.strip() if soup.title and soup.title.string else ""
-    paragraphs = [p.get_text(strip=True) for p in soup.find_all("p")]
-    links = [urljoin(base_url, a["href"]) for a in soup.find_all("a", href=True)]
-    content = "\n".join(paragraphs)
-    return {
-        "url": base_url,
-        "title": title or base_url,
-        "text": content,
-        "links": links,
-    }
+    return await parser_pool.run_parser(extract_page, text, base_url)
+
+
+def extract_page(text: str, base_url: str) -> Dict[str, Any]:
+    return get_extractor().extract(text, base_url)
@@ -0,0 +1,190 @@
+"""Pluggable HTML extraction backends producing ``{url, title, text, links}``."""
+from __future__ import annotations
+
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+from src.utils.logger import logger
+
+_PREFERENCE = ("lxml", "selectolax", "bs4")
+_XML_DECLARATION_RE = re.compile(r"^\s*<\?xml[^>]*\?>")
+# Never part of a paragraph's visible text.
+_SKIPPED = frozenset({"script", "style", "template"})
+# Block elements end an open ``<p>`` in browsers (and in lxml/lexbor), but
+# ``html.parser`` nests them inside it; their text is excluded so every
+# backend sees the same paragraphs in tag soup such as ``<p>one<p>two``.
+_BLOCKS = frozenset({
+    "address", "article", "aside", "blockquote", "details", "dialog", "div", "dl", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hgroup", "hr", "main", "menu", "nav", "ol", "p", "pre", "section", "table", "ul",
+})
+_EXCLUDED = _SKIPPED | _BLOCKS
+
+
+class HTMLExtractor(ABC):
+    """Base class for extraction backends.
+
+    Every backend must return the same page dict: the first ``<title>`` and
+    the text of each ``<p>`` with whitespace collapsed, where a paragraph's
+    text leaves out ``<script>``/``<style>``/``<template>`` content and any
+    nested block elements, and every ``<a href>`` resolved against the page
+    URL. ``benchmarks/bench_extractors.py`` checks this on the fixtures,
+    including XHTML and tag-soup pages.
+    """
+
+    name = "base"
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    @abstractmethod
+    def extract(self, text: str, base_url: str) -> Dict[str, Any]:
+        """Return the ``{url, title, text, links}`` page dict for ``text``."""
+
+    @staticmethod
+    def _page(base_url: str, title: str, paragraphs: List[str], hrefs: List[str]) -> Dict[str, Any]:
+        return {
+            "url": base_url,
+            "title": title or base_url,
+            "text": "\n".join(paragraphs),
+            "links": [urljoin(base_url, href) for href in hrefs],
+        }
+
+
+class BeautifulSoupExtractor(HTMLExtractor):
+    """Reference backend using the pure-Python ``html.parser``."""
+
+    name = "bs4"
+
+    def extract(self, text: str, base_url: str) -> Dict[str, Any]:
+        soup = BeautifulSoup(text, "html.parser")
+        title = _collapse(soup.title.get_text()) if soup.title else ""
+        paragraphs = [_collapse("".join(_soup_text(p))) for p in soup.find_all("p")]
+        hrefs = [a["href"] for a in soup.find_all("a", href=True)]
+        return self._page(base_url, title, paragraphs, hrefs)
+
+
+class LxmlExtractor(HTMLExtractor):
+    name = "lxml"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import lxml.html  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def extract(self, text: str, base_url: str) -> Dict[str, Any]:
+        import lxml.html
+
+        # lxml rejects str input that carries an encoding declaration (XHTML).
+        text = _XML_DECLARATION_RE.sub("", text, count=1)
+        if not text.strip():
+            return self._page(base_url, "", [], [])
+        root = lxml.html.document_fromstring(text)
+        title_el = root.find(".//title")
+        title = _collapse("".join(title_el.itertext())) if title_el is not None else ""
+        paragraphs = [_collapse("".join(_lxml_text(p))) for p in root.iter("p")]
+        hrefs = [a.get("href") for a in root.iter("a") if a.get("href") is not None]
+        return self._page(base_url, title, paragraphs, hrefs)
+
+
+class SelectolaxExtractor(HTMLExtractor):
+    name = "selectolax"
+
+    @classmethod
+    def available(cls) -> bool:
+        return _selectolax_parser() is not None
+
+    def extract(self, text: str, base_url: str) -> Dict[str, Any]:
+        tree = _selectolax_parser()(text)
+        title_node = tree.css_first("title")
+        title = _collapse(title_node.text(deep=True)) if title_node is not None else ""
+        paragraphs = [_collapse("".join(_selectolax_text(p))) for p in tree.css("p")]
+        hrefs = [a.attributes.get("href") for a in tree.css("a[href]")]
+        return self._page(base_url, title, paragraphs, [href for href in hrefs if href is not None])
+
+
+def _selectolax_parser() -> Any:
+    try:  # selectolax >= 1.0 only ships the lexbor backend
+        from selectolax.lexbor import LexborHTMLParser
+
+        return LexborHTMLParser
+    except ImportError:
+        pass
+    try:
+        from selectolax.parser import HTMLParser
+
+        return HTMLParser
+    except ImportError:
+        return None
+
+
+def _collapse(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _soup_text(node: Tag) -> Iterator[str]:
+    for child in node.children:
+        if isinstance(child, Tag):
+            if child.name not in _EXCLUDED:
+                yield from _soup_text(child)
+        elif type(child) is NavigableString:
+            # Subclasses are comments, doctypes, CDATA and script/style strings.
+            yield str(child)
+
+
+def _lxml_text(node: Any) -> Iterator[str]:
+    if node.text:
+        yield node.text
+    for child in node:
+        if isinstance(child.tag, str) and child.tag not in _EXCLUDED:
+            yield from _lxml_text(child)
+        if child.tail:
+            yield child.tail
+
+
+def _selectolax_text(node: Any) -> Iterator[str]:
+    for child in node.iter(include_text=True):
+        if child.tag == "-text":
+            yield child.text(deep=False)
+        elif not child.tag.startswith(("-", "_", "!")) and child.tag not in _EXCLUDED:
+            yield from _selectolax_text(child)
+
+
+_BACKENDS = {cls.name: cls for cls in (BeautifulSoupExtractor, LxmlExtractor, SelectolaxExtractor)}
+_INSTANCE: Optional[HTMLExtractor] = None
+
+
+def available_extractors() -> List[str]:
+    return [name for name, cls in _BACKENDS.items() if cls.available()]
+
+
+def get_extractor(name: Optional[str] = None) -> HTMLExtractor:
+    """Return the requested backend, or the fastest installed one.
+
+    ``QUERYNOVA_EXTRACTOR`` selects a backend per deployment; unknown or
+    uninstalled names fall back to BeautifulSoup.
+    """
+    global _INSTANCE
+    if name is None and _INSTANCE is not None:
+        return _INSTANCE
+    requested = (name or os.getenv("QUERYNOVA_EXTRACTOR", "auto")).lower()
+    if requested == "auto":
+        chosen = next(_BACKENDS[key] for key in _PREFERENCE if _BACKENDS[key].available())
+    else:
+        chosen = _BACKENDS.get(requested, BeautifulSoupExtractor)
+        if not chosen.available():
+            logger.warning("Extractor %s is not installed; using BeautifulSoup", requested)
+            chosen = BeautifulSoupExtractor
+    extractor = chosen()
+    if name is None:
+        _INSTANCE = extractor
+    return extractor
@@ -0,0 +1,94 @@
+"""Executor management for CPU-bound HTML extraction."""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+from src.utils.logger import logger
+
+T = TypeVar("T")
+
+_DEFAULT_WORKERS = int(os.getenv("QUERYNOVA_PARSE_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+_MODE = os.getenv("QUERYNOVA_PARSE_EXECUTOR", "auto").lower()
+# Pages below this size are parsed inline; shipping them to a worker costs more than parsing.
+_INLINE_BELOW = int(os.getenv("QUERYNOVA_PARSE_INLINE_BYTES", "16384"))
+
+_LOCK = threading.Lock()
+_EXECUTOR: Optional[Executor] = None
+_WORKERS = _DEFAULT_WORKERS
+
+
+def _gil_disabled() -> bool:
+    check = getattr(sys, "_is_gil_enabled", None)
+    return check is not None and not check()
+
+
+def _resolve_mode() -> str:
+    if _MODE in {"process", "thread", "inline"}:
+        return _MODE
+    return "thread" if _gil_disabled() else "process"
+
+
+def configure(workers: Optional[int] = None) -> None:
+    """Resize the parser pool; takes effect when the pool is next created."""
+    global _WORKERS, _EXECUTOR
+    if not workers or workers == _WORKERS:
+        return
+    with _LOCK:
+        _WORKERS = workers
+        previous, _EXECUTOR = _EXECUTOR, None
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+def _get_executor() -> Optional[Executor]:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            mode = _resolve_mode()
+            if mode == "inline":
+                return None
+            if mode == "process":
+                _EXECUTOR = ProcessPoolExecutor(max_workers=_WORKERS)
+            else:
+                _EXECUTOR = ThreadPoolExecutor(max_workers=_WORKERS, thread_name_prefix="querynova-parse")
+        return _EXECUTOR
+
+
+def _fallback_to_threads(exc: BaseException) -> Executor:
+    # Daemonic processes (e.g. Celery prefork children) cannot spawn a process pool.
+    global _EXECUTOR
+    logger.warning("Process parser pool unavailable (%s); using threads", exc)
+    with _LOCK:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=_WORKERS, thread_name_prefix="querynova-parse")
+        return _EXECUTOR
+
+
+async def run_parser(func: Callable[..., T], text: str, *args: Any) -> T:
+    """Run ``func(text, *args)`` off the event loop unless the page is small."""
+    executor = _get_executor()
+    if executor is None or len(text) < _INLINE_BELOW:
+        return func(text, *args)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(executor, func, text, *args)
+    except (AssertionError, BrokenProcessPool, OSError) as exc:
+        if not isinstance(executor, ProcessPoolExecutor):
+            raise
+        executor = _fallback_to_threads(exc)
+        return await loop.run_in_executor(executor, func, text, *args)
+
+
+def shutdown(*_: Any, **__: Any) -> None:
+    global _EXECUTOR
+    with _LOCK:
+        executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        # A process pool left to tear down in the background races interpreter
+        # exit and fails with EBADF; wait for its workers to stop.
+        executor.shutdown(wait=isinstance(executor, ProcessPoolExecutor), cancel_futures=True)
@@ -0,0 +1,226 @@
+"""Domain reliability index loaded from a data file and matched by label suffix."""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.utils.logger import logger
+
+_DATA_PATH = os.getenv(
+    "QUERYNOVA_RELIABILITY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "domain_reliability.txt"),
+)
+_RELOAD_INTERVAL = float(os.getenv("QUERYNOVA_RELIABILITY_RELOAD", "30"))
+_MEMO_SIZE = 65536
+DEFAULT_SCORE = 0.6
+MISSING_SCORE = 0.2
+
+# Used when the data file is missing or unreadable.
+_BUILTIN_RULES = (
+    (".edu", 0.95),
+    (".gov", 0.9),
+    (".org", 0.8),
+    (".news", 0.75),
+    (".blog", 0.55),
+)
+
+
+class _Node:
+    __slots__ = ("children", "score", "exact")
+
+    def __init__(self) -> None:
+        self.children: Optional[Dict[str, "_Node"]] = None
+        self.score: Optional[float] = None
+        self.exact: Optional[float] = None
+
+
+class ReliabilityIndex:
+    """Suffix trie over reversed host labels.
+
+    Rules come in three forms:
+
+    * ``.tld`` or ``.co.uk`` -- a public suffix; matches every host under it.
+    * ``example.com`` -- a registrable domain; matches it and its subdomains.
+    * ``=docs.example.com`` -- an exact host only.
+
+    The most specific rule wins: an exact host beats the deepest matching
+    domain, which beats a shorter suffix. Matching is label-aligned, so
+    ``.news`` matches ``example.news`` but not ``fakenews.com``. Results are
+    memoized per host.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, float]] = (), default: float = DEFAULT_SCORE) -> None:
+        self.default = default
+        self._root = _Node()
+        self._size = 0
+        self._memo: Dict[str, float] = {}
+        for pattern, score in rules:
+            self.add(pattern, score)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, pattern: str, score: float) -> None:
+        pattern = pattern.strip().lower()
+        exact = pattern.startswith("=")
+        labels = pattern.lstrip("=.").rstrip(".").split(".")
+        if not labels or not labels[0]:
+            raise ValueError(f"invalid reliability rule: {pattern!r}")
+        node = self._root
+        for label in reversed(labels):
+            if node.children is None:
+                node.children = {}
+            child = node.children.get(label)
+            if child is None:
+                child = node.children[label] = _Node()
+            node = child
+        if exact:
+            node.exact = score
+        else:
+            node.score = score
+        self._size += 1
+        self._memo.clear()
+
+    def score_host(self, host: str) -> float:
+        cached = self._memo.get(host)
+        if cached is not None:
+            return cached
+        score = self._lookup(host)
+        if len(self._memo) >= _MEMO_SIZE:
+            self._memo.clear()
+        self._memo[host] = score
+        return score
+
+    def _lookup(self, host: str) -> float:
+        labels = host.rstrip(".").split(".")
+        node = self._root
+        best = self.default
+        for depth, label in enumerate(reversed(labels), start=1):
+            if node.children is None:
+                break
+            node = node.children.get(label)
+            if node is None:
+                break
+            if depth == len(labels) and node.exact is not None:
+                return node.exact
+            if node.score is not None:
+                best = node.score
+        return best
+
+
+def parse_rules(lines: Iterable[str]) -> Tuple[list, float]:
+    """Parse ``pattern score`` lines; ``* score`` sets the default score."""
+    rules = []
+    default = DEFAULT_SCORE
+    for number, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            pattern, value = line.split()
+            score = float(value)
+        except ValueError:
+            logger.warning("Ignoring malformed reliability rule on line %d: %r", number, line)
+            continue
+        if pattern == "*":
+            default = score
+        else:
+            rules.append((pattern, score))
+    return rules, default
+
+
+def load_index(path: str = _DATA_PATH) -> ReliabilityIndex:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            rules, default = parse_rules(handle)
+    except OSError as exc:
+        logger.warning("Reliability data unavailable at %s (%s); using built-in tiers", path, exc)
+        return ReliabilityIndex(_BUILTIN_RULES)
+    return ReliabilityIndex(rules, default)
+
+
+_INDEX: Optional[ReliabilityIndex] = None
+_INDEX_MTIME: Optional[float] = None
+_NEXT_CHECK = 0.0
+_RELOADING = False
+_LOCK = threading.Lock()
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _install(index: ReliabilityIndex, mtime: Optional[float]) -> None:
+    global _INDEX, _INDEX_MTIME
+    _INDEX, _INDEX_MTIME = index, mtime
+    logger.info("Loaded %d domain reliability rules", len(index))
+
+
+def _rebuild(mtime: Optional[float]) -> None:
+    global _RELOADING
+    try:
+        index = load_index(_DATA_PATH)
+    except Exception as exc:
+        logger.warning("Reliability reload failed; keeping the current index: %s", exc)
+    else:
+        with _LOCK:
+            _install(index, mtime)
+    finally:
+        with _LOCK:
+            _RELOADING = False
+
+
+def get_index() -> ReliabilityIndex:
+    """Return the shared index, reloading it when the data file has changed.
+
+    The file's mtime is checked at most every ``QUERYNOVA_RELIABILITY_RELOAD``
+    seconds. A changed file is rebuilt on a background thread while callers
+    keep using the current index, and the new trie is swapped in whole. Only
+    the very first load happens on the calling thread; async callers should
+    make that call through ``asyncio.to_thread``.
+    """
+    global _NEXT_CHECK, _RELOADING
+    now = time.monotonic()
+    index = _INDEX
+    if index is not None and now < _NEXT_CHECK:
+        return index
+    with _LOCK:
+        if _INDEX is None:
+            mtime = _mtime(_DATA_PATH)
+            _install(load_index(_DATA_PATH), mtime)
+            _NEXT_CHECK = now + _RELOAD_INTERVAL
+            return _INDEX
+        if now >= _NEXT_CHECK:
+            _NEXT_CHECK = now + _RELOAD_INTERVAL
+            mtime = _mtime(_DATA_PATH)
+            if mtime != _INDEX_MTIME and not _RELOADING:
+                _RELOADING = True
+                threading.Thread(target=_rebuild, args=(mtime,), name="querynova-reliability", daemon=True).start()
+        return _INDEX
+
+
+def reload() -> ReliabilityIndex:
+    """Rebuild the index from the data file now, blocking until it is swapped in."""
+    mtime = _mtime(_DATA_PATH)
+    index = load_index(_DATA_PATH)
+    with _LOCK:
+        _install(index, mtime)
+    return index
+
+
+def domain_reliability(url: str) -> float:
+    if not url:
+        return MISSING_SCORE
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        host = None
+    if not host:
+        return get_index().default
+    return get_index().score_host(host)
@@ -0,0 +1,191 @@
+"""Politeness-aware scheduling for crawler requests."""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from src.utils.http_client import USER_AGENT
+from src.utils.logger import logger
+
+_GLOBAL_LIMIT = int(os.getenv("QUERYNOVA_CRAWL_CONCURRENCY", "16"))
+_PER_HOST_LIMIT = int(os.getenv("QUERYNOVA_CRAWL_PER_HOST", "2"))
+_HOST_DELAY = float(os.getenv("QUERYNOVA_CRAWL_HOST_DELAY", "0.25"))
+_RESPECT_ROBOTS = os.getenv("QUERYNOVA_RESPECT_ROBOTS", "true").lower() in {"1", "true", "yes"}
+_BREAKER_THRESHOLD = int(os.getenv("QUERYNOVA_BREAKER_THRESHOLD", "3"))
+_BREAKER_WINDOW = float(os.getenv("QUERYNOVA_BREAKER_WINDOW", "300"))
+_BREAKER_COOLDOWN = float(os.getenv("QUERYNOVA_BREAKER_COOLDOWN", "120"))
+_ROBOTS_TTL = 3600.0
+_ROBOTS_MAX_HOSTS = 2048
+# Past-due spacing entries carry no information; they are swept once the
+# table grows beyond this many hosts.
+_NEXT_SLOT_PRUNE_AT = 1024
+
+# Shared across schedulers so concurrent searches stay polite towards a host.
+_NEXT_SLOT: Dict[str, float] = {}
+_NEXT_SLOT_LOCK = threading.Lock()
+_ROBOTS: "OrderedDict[str, Tuple[float, Optional[RobotFileParser]]]" = OrderedDict()
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class CrawlScheduler:
+    """Bounds crawl concurrency globally and per host, and spaces requests per host.
+
+    A request first waits for a per-host slot, then for its host's minimum
+    spacing, and only then takes a global slot, so a slow domain never holds
+    global capacity while it queues.
+    """
+
+    def __init__(
+        self,
+        global_limit: int = _GLOBAL_LIMIT,
+        per_host_limit: int = _PER_HOST_LIMIT,
+        host_delay: float = _HOST_DELAY,
+        respect_robots: bool = _RESPECT_ROBOTS,
+    ) -> None:
+        self.host_delay = host_delay
+        self.respect_robots = respect_robots
+        self._global = asyncio.Semaphore(global_limit)
+        self._per_host_limit = per_host_limit
+        self._hosts: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self._per_host_limit))
+        self._robots_pending: Dict[str, "asyncio.Task[Optional[RobotFileParser]]"] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        host = host_of(url)
+        async with self._hosts[host]:
+            await self._wait_for_spacing(host)
+            async with self._global:
+                yield
+
+    async def allowed(self, client: httpx.AsyncClient, url: str) -> bool:
+        """Return whether robots.txt permits fetching ``url``."""
+        if not self.respect_robots:
+            return True
+        parsed = urlparse(url)
+        if not parsed.netloc:
+            return True
+        host = parsed.netloc.lower()
+        parser = await self._robots_for(client, parsed.scheme or "https", host)
+        if parser is None:
+            return True
+        return parser.can_fetch(USER_AGENT, url)
+
+    async def _wait_for_spacing(self, host: str) -> None:
+        if self.host_delay <= 0:
+            return
+        now = time.monotonic()
+        with _NEXT_SLOT_LOCK:
+            start = max(now, _NEXT_SLOT.get(host, 0.0))
+            _NEXT_SLOT[host] = start + self.host_delay
+            if len(_NEXT_SLOT) > _NEXT_SLOT_PRUNE_AT:
+                for stale in [key for key, slot in _NEXT_SLOT.items() if slot <= now]:
+                    del _NEXT_SLOT[stale]
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _robots_for(self, client: httpx.AsyncClient, scheme: str, host: str) -> Optional[RobotFileParser]:
+        cached = _ROBOTS.get(host)
+        if cached and cached[0] > time.monotonic():
+            _ROBOTS.move_to_end(host)
+            return cached[1]
+        task = self._robots_pending.get(host)
+        if task is None:
+            task = asyncio.ensure_future(_fetch_robots(client, f"{scheme}://{host}/robots.txt"))
+            self._robots_pending[host] = task
+        try:
+            parser = await task
+        finally:
+            self._robots_pending.pop(host, None)
+        _ROBOTS[host] = (time.monotonic() + _ROBOTS_TTL, parser)
+        _ROBOTS.move_to_end(host)
+        while len(_ROBOTS) > _ROBOTS_MAX_HOSTS:
+            _ROBOTS.popitem(last=False)
+        return parser
+
+
+class HostCircuitBreaker:
+    """Skips hosts that failed repeatedly in the recent past.
+
+    After ``threshold`` failures inside ``window`` seconds a host is open
+    (skipped) for ``cooldown`` seconds. The first request after the cooldown
+    is let through as a trial while the host stays open for everyone else;
+    a success closes the breaker, a failure extends it.
+    """
+
+    def __init__(
+        self,
+        threshold: int = _BREAKER_THRESHOLD,
+        window: float = _BREAKER_WINDOW,
+        cooldown: float = _BREAKER_COOLDOWN,
+    ) -> None:
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self._failures: Dict[str, list] = defaultdict(list)
+        self._open_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, url: str) -> bool:
+        host = host_of(url)
+        with self._lock:
+            until = self._open_until.get(host)
+            if until is None:
+                return True
+            if time.monotonic() < until:
+                return False
+            self._open_until[host] = time.monotonic() + self.cooldown
+            return True
+
+    def record_success(self, url: str) -> None:
+        host = host_of(url)
+        with self._lock:
+            self._failures.pop(host, None)
+            self._open_until.pop(host, None)
+
+    def record_failure(self, url: str) -> None:
+        host = host_of(url)
+        now = time.monotonic()
+        with self._lock:
+            recent = [stamp for stamp in self._failures[host] if now - stamp < self.window]
+            recent.append(now)
+            self._failures[host] = recent
+            if len(recent) >= self.threshold:
+                self._open_until[host] = now + self.cooldown
+                logger.warning("Circuit opened for %s after %d failures", host, len(recent))
+
+    def open_hosts(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            return [host for host, until in self._open_until.items() if until > now]
+
+
+breaker = HostCircuitBreaker()
+
+
+async def _fetch_robots(client: httpx.AsyncClient, robots_url: str) -> Optional[RobotFileParser]:
+    try:
+        response = await client.get(robots_url, timeout=5)
+    except Exception as exc:
+        logger.debug("robots.txt unavailable at %s: %s", robots_url, exc)
+        return None
+    if response.status_code in (401, 403):
+        parser = RobotFileParser()
+        parser.disallow_all = True
+        return parser
+    if response.status_code >= 400:
+        return None
+    parser = RobotFileParser()
+    parser.parse(response.text.splitlines())
+    return parser
@@ -1,21 +1,50 @@
 """Plugin registry allowing extensions for crawlers and renderers."""
 from __future__ import annotations
 
-from typing import Callable, Dict, List
+import asyncio
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 
 from src.utils.logger import logger
 
-CrawlerHook = Callable[[str], Dict[str, str]]
+CrawlerHook = Callable[[str], Union[Dict[str, str], Awaitable[Dict[str, str]]]]
 RendererHook = Callable[[Dict[str, str]], Dict[str, str]]
 
+_DEFAULT_TIMEOUT = float(os.getenv("QUERYNOVA_PLUGIN_TIMEOUT", "5"))
+_PLUGIN_WORKERS = int(os.getenv("QUERYNOVA_PLUGIN_WORKERS", "4"))
+
+
+@dataclass
+class PluginStats:
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
 
 class PluginRegistry:
     def __init__(self) -> None:
         self._crawlers: Dict[str, CrawlerHook] = {}
         self._renderers: Dict[str, RendererHook] = {}
+        self._timeouts: Dict[str, float] = {}
+        self._stats: Dict[str, PluginStats] = {}
+        self._stats_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
 
-    def register_crawler(self, name: str, handler: CrawlerHook) -> None:
+    def register_crawler(self, name: str, handler: CrawlerHook, timeout: Optional[float] = None) -> None:
+        """Register a crawler hook; ``handler`` may be a plain or ``async`` callable."""
         self._crawlers[name] = handler
+        self._timeouts[name] = _DEFAULT_TIMEOUT if timeout is None else timeout
         logger.info("Registered crawler plugin: %s", name)
 
     def register_renderer(self, name: str, handler: RendererHook) -> None:
@@ -36,5 +65,71 @@ class PluginRegistry:
             "renderers": list(self._renderers.keys()),
         }
 
+    async def run_crawlers(self, url: str) -> Dict[str, Any]:
+        """Run every crawler hook for ``url`` concurrently, each under its own timeout.
+
+        Sync hooks run on a dedicated thread pool so they cannot block the
+        event loop. Failed or timed-out hooks are logged and left out of the
+        result.
+        """
+        crawlers = self.crawlers
+        if not crawlers:
+            return {}
+        names = list(crawlers)
+        outcomes = await asyncio.gather(*(self._run_crawler(name, crawlers[name], url) for name in names))
+        return {name: extra for name, (ok, extra) in zip(names, outcomes) if ok}
+
+    def plugin_stats(self) -> Dict[str, Dict[str, float]]:
+        with self._stats_lock:
+            return {
+                name: {**asdict(stats), "mean_seconds": stats.mean_seconds}
+                for name, stats in self._stats.items()
+            }
+
+    def shutdown(self, *_: Any, **__: Any) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_crawler(self, name: str, handler: CrawlerHook, url: str) -> tuple[bool, Any]:
+        timeout = self._timeouts.get(name, _DEFAULT_TIMEOUT)
+        started = time.perf_counter()
+        failed = timed_out = False
+        try:
+            if inspect.iscoroutinefunction(handler):
+                call = handler(url)
+            else:
+                loop = asyncio.get_running_loop()
+                call = loop.run_in_executor(self._get_executor(), handler, url)
+            result = await asyncio.wait_for(call, timeout=timeout)
+            if inspect.isawaitable(result):
+                remaining = max(timeout - (time.perf_counter() - started), 0.0)
+                result = await asyncio.wait_for(result, timeout=remaining)
+            return True, result
+        except asyncio.TimeoutError:
+            timed_out = True
+            logger.error("Plugin crawler timed out after %.1fs (%s)", timeout, name)
+            return False, None
+        except Exception as exc:
+            failed = True
+            logger.error("Plugin crawler failed (%s): %s", name, exc)
+            return False, None
+        finally:
+            self._record(name, time.perf_counter() - started, failed, timed_out)
+
+    def _record(self, name: str, elapsed: float, failed: bool, timed_out: bool) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(name, PluginStats())
+            stats.calls += 1
+            stats.failures += int(failed)
+            stats.timeouts += int(timed_out)
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=_PLUGIN_WORKERS, thread_name_prefix="querynova-plugin")
+        return self._executor
+
 
-registry = PluginRegistry()
\ No newline at end of file
+registry = PluginRegistry()
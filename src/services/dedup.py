@@ -0,0 +1,106 @@
+"""Near-duplicate detection for crawled pages using SimHash fingerprints."""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+_BITS = 64
+_BANDS = 4
+_BAND_BITS = _BITS // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+# Bounds the work for very large pages; the leading shingles already
+# characterize a document well enough for near-duplicate detection.
+_MAX_SHINGLES = 20000
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """Return a 64-bit SimHash of ``text`` built from word shingles."""
+    return _fingerprint(_TOKEN_RE.findall(text.lower()), shingle_size)
+
+
+def _fingerprint(tokens: List[str], shingle_size: int = 3) -> int:
+    if len(tokens) < shingle_size:
+        shingles = [" ".join(tokens)] if tokens else []
+    else:
+        count = min(len(tokens) - shingle_size + 1, _MAX_SHINGLES)
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(count)]
+    if not shingles:
+        return 0
+    digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles)
+    # One row of 64 bits per shingle, column k holding bit k of its hash.
+    values = np.frombuffer(digests, dtype=">u8").astype("<u8")
+    bits = np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    weights = 2 * bits.sum(axis=0, dtype=np.int64) - len(shingles)
+    return int(np.packbits(weights > 0, bitorder="little").view("<u8")[0])
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateFilter:
+    """Collapses syndicated copies of the same content before ranking.
+
+    Pages whose SimHash fingerprints differ by at most ``max_distance`` bits
+    are clustered; the page with the most text is kept and the rest are
+    attached to it under ``alternates``. Candidate pairs come from banded
+    LSH buckets (a match within 3 bits must agree on at least one 16-bit
+    band), so the comparison cost stays near linear in the page count.
+    """
+
+    def __init__(self, max_distance: int = 3, min_tokens: int = 30) -> None:
+        self.max_distance = max_distance
+        self.min_tokens = min_tokens
+
+    def deduplicate(self, pages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Return the representative pages in input order and how many were removed."""
+        fingerprints: Dict[int, int] = {}
+        for idx, page in enumerate(pages):
+            tokens = _TOKEN_RE.findall((page.get("text") or "").lower())
+            if len(tokens) >= self.min_tokens:
+                fingerprints[idx] = _fingerprint(tokens)
+        if len(fingerprints) < 2:
+            return list(pages), 0
+
+        parent = list(range(len(pages)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for idx, fingerprint in fingerprints.items():
+            for band in range(_BANDS):
+                buckets[(band, fingerprint >> (band * _BAND_BITS) & _BAND_MASK)].append(idx)
+        for members in buckets.values():
+            for pos, left in enumerate(members):
+                for right in members[pos + 1:]:
+                    if find(left) == find(right):
+                        continue
+                    if hamming_distance(fingerprints[left], fingerprints[right]) <= self.max_distance:
+                        parent[find(right)] = find(left)
+
+        clusters: Dict[int, List[int]] = defaultdict(list)
+        for idx in range(len(pages)):
+            clusters[find(idx)].append(idx)
+
+        kept: List[Tuple[int, Dict[str, Any]]] = []
+        for members in clusters.values():
+            best = max(members, key=lambda i: (len(pages[i].get("text") or ""), -i))
+            representative = pages[best]
+            duplicates = [pages[i] for i in members if i != best]
+            if duplicates:
+                representative = dict(representative)
+                representative["alternates"] = list(representative.get("alternates") or []) + [
+                    {"url": dup.get("url"), "title": dup.get("title") or dup.get("url")} for dup in duplicates
+                ]
+            kept.append((min(members), representative))
+        kept.sort(key=lambda item: item[0])
+        return [page for _, page in kept], len(pages) - len(kept)
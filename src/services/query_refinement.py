@@ -7,9 +7,10 @@ from collections import Counter
 from typing import Dict, Iterable, List
 
 try:  # pragma: no cover - optional dependency on OpenAI embeddings
-    from modules.ai_filter import get_embedding
+    from modules.ai_filter import get_embedding, get_embeddings
 except Exception:  # pragma: no cover
     get_embedding = None  # type: ignore
+    get_embeddings = None  # type: ignore
 
 _STOPWORDS = {
     "the",
@@ -57,10 +58,10 @@ def _extract_terms(text: str) -> List[str]:
 
 def _rerank_by_embedding(query: str, suggestions: List[str]) -> List[str]:  # pragma: no cover - remote call
     try:
-        query_vec = get_embedding(query)
+        # Batched through the shared embedding cache, so repeat suggestions cost nothing.
+        query_vec, *vectors = get_embeddings([query] + suggestions)
         scored = []
-        for suggestion in suggestions:
-            vec = get_embedding(suggestion)
+        for suggestion, vec in zip(suggestions, vectors):
             score = sum(a * b for a, b in zip(query_vec, vec))
             scored.append((score, suggestion))
         scored.sort(reverse=True)
@@ -9,14 +9,15 @@ from typing import Any, Callable, Dict, List, Optional
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from modules.search import search as serpapi_search
-from modules.crawl import crawl_pages
-from modules.ai_filter import rank_pages
+from modules.crawl import iter_crawl_pages
+from modules.ai_filter import RankingConfig, rank_pages_async
 from src.services.query_refinement import suggest_queries
 from src.services.summarizer import Summarizer
 from src.services.sentiment import SentimentAnalyzer
 from src.services.heatmap import HeatmapBuilder
 from src.services.export_service import ExportBuilder
 from src.services.knowledge_base import KnowledgeBase
+from src.services.dedup import NearDuplicateFilter
 from src.utils import cache
 from src.utils.logger import logger
 
@@ -34,6 +35,16 @@ class SearchOptions:
     include_knowledge: bool = True
     offline_mode: bool = False
     include_pdf: bool = False
+    deduplicate: bool = True
+    parse_workers: Optional[int] = None
+    crawl_deadline: Optional[float] = 20.0
+    summary_top_k: int = 5
+    ranking_mode: str = "two_stage"
+    rerank_top_n: int = 20
+    semantic_weight: float = 0.8
+    lexical_weight: float = 0.2
+    reliability_weight: float = 0.3
+    passage_aggregation: str = "max"
     user_id: Optional[str] = None
 
 
@@ -53,6 +64,7 @@ class SearchService:
         self.heatmap = HeatmapBuilder()
         self.exporter = ExportBuilder()
         self.knowledge_base = knowledge_base or KnowledgeBase()
+        self.dedup = NearDuplicateFilter()
 
     async def run(self, payload: SearchPayload, progress: Optional[ProgressHandler] = None) -> Dict[str, Any]:
         def emit(stage: str, data: Optional[Dict[str, Any]] = None) -> None:
@@ -147,11 +159,41 @@ class SearchService:
         if results_raw:
             urls = [r["link"] for r in results_raw]
             emit("crawling", {"count": len(urls)})
-            pages = await crawl_pages(urls, progress_handler=lambda meta: emit("crawl_progress", meta))
+            async for page in iter_crawl_pages(
+                urls,
+                progress_handler=lambda meta: emit("crawl_progress", meta),
+                parse_workers=payload.options.parse_workers,
+                deadline=payload.options.crawl_deadline,
+            ):
+                pages.append(page)
+                emit("page_ready", {"url": page.get("url"), "title": page.get("title"), "completed": len(pages)})
+            # Pages arrive in completion order; restore SERP order so dedup
+            # representatives and ranking ties do not depend on network timing.
+            position: Dict[str, int] = {}
+            for idx, url in enumerate(urls):
+                position.setdefault(url, idx)
+            pages.sort(key=lambda page: position.get(page.get("url"), len(urls)))
             emit("crawl_complete", {"count": len(pages)})
 
+        if pages and payload.options.deduplicate:
+            pages, removed = await asyncio.to_thread(self.dedup.deduplicate, pages)
+            emit("dedup_complete", {"count": len(pages), "removed": removed})
+
         emit("ranking", {})
-        ranked = rank_pages(query, pages, knowledge_base=self.knowledge_base)
+        ranked = await rank_pages_async(
+            query,
+            pages,
+            knowledge_base=self.knowledge_base,
+            summary_top_k=payload.options.summary_top_k,
+            config=RankingConfig(
+                mode=payload.options.ranking_mode,
+                rerank_top_n=payload.options.rerank_top_n,
+                semantic_weight=payload.options.semantic_weight,
+                lexical_weight=payload.options.lexical_weight,
+                reliability_weight=payload.options.reliability_weight,
+                aggregation=payload.options.passage_aggregation,
+            ),
+        )
         emit("ranking_complete", {"count": len(ranked)})
 
         summary = None
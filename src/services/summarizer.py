@@ -1,19 +1,16 @@
 """Summarization helpers for QueryNova."""
 from __future__ import annotations
 
-import asyncio
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from src.utils.ai_provider import get_ai_provider
 from src.utils.logger import logger
 
-_DEFAULT_MODEL = "gpt-4o-mini"
-
-
 class Summarizer:
     """Leverages LLM to synthesize ranked results."""
 
-    def __init__(self, model: str = _DEFAULT_MODEL) -> None:
+    def __init__(self, model: Optional[str] = None) -> None:
+        # ``None`` uses the model configured for the "synthesis" task.
         self.model = model
 
     async def summarize(
@@ -25,7 +22,6 @@ class Summarizer:
         if not ranked_results:
             return None, []
 
-        loop = asyncio.get_event_loop()
         prompt = self._build_prompt(query, ranked_results, knowledge_base)
         provider = get_ai_provider()
         
@@ -33,23 +29,21 @@ class Summarizer:
             logger.warning("No AI provider available, using fallback")
             return self._fallback_summary(ranked_results)
 
-        def _invoke() -> Tuple[str, List[str]]:
-            summary_text = provider.generate_text(
+        try:
+            summary_text = await provider.generate_text_async(
                 prompt=prompt,
                 system_prompt="You are QueryNova's research analyst. Craft concise, decision-ready insight.",
-                max_tokens=400
+                max_tokens=400,
+                cache=True,
+                task="synthesis",
+                model=self.model,
             )
-            
             if not summary_text:
                 raise RuntimeError("Empty response from AI provider")
-            
+
             bullets = self._extract_bullets(summary_text)
             intro = summary_text.split("\n\n", 1)[0]
             return intro.strip(), bullets
-
-        try:
-            summary, insights = await loop.run_in_executor(None, _invoke)
-            return summary, insights
         except Exception as exc:  # pragma: no cover - depends on remote service
             logger.error("LLM summarization failed: %s", exc)
             return self._fallback_summary(ranked_results)
@@ -4,9 +4,20 @@ from __future__ import annotations
 import os
 
 from celery import Celery
+from celery.signals import worker_process_shutdown, worker_shutdown
+
+from src.modules import parser_pool
+from src.plugins.registry import registry
+from src.utils import ai_provider, http_client
 
 broker_url = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 backend_url = os.getenv("CELERY_RESULT_BACKEND", broker_url)
 
 celery_app = Celery("querynova", broker=broker_url, backend=backend_url)
 celery_app.conf.update(task_serializer="json", result_serializer="json", accept_content=["json"])
+
+worker_process_shutdown.connect(http_client.shutdown, weak=False)
+worker_shutdown.connect(http_client.shutdown, weak=False)
+worker_process_shutdown.connect(parser_pool.shutdown, weak=False)
+worker_process_shutdown.connect(registry.shutdown, weak=False)
+worker_process_shutdown.connect(ai_provider.shutdown, weak=False)
@@ -4,10 +4,47 @@ Provides unified interface for Gemini AI (embeddings and text generation).
 """
 from __future__ import annotations
 
-from typing import List, Optional, Dict, Any
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Dict, Sequence, Tuple, TypeVar
+
+from src.utils import llm_cache
+from src.utils.rate_limit import ProviderLimiter, estimate_tokens, is_throttled
 from src.utils.secrets import get_secret
 from src.utils.logger import logger
 
+T = TypeVar("T")
+
+EMBEDDING_MODEL = "models/embedding-001"
+TEXT_MODEL = os.getenv("QUERYNOVA_MODEL_DEFAULT", "gemini-pro")
+DEFAULT_EMBEDDING_TASK = "retrieval_document"
+
+# Text model per task; override with QUERYNOVA_MODEL_<TASK> or set_task_model().
+TASK_MODELS: Dict[str, str] = {
+    "summary": os.getenv("QUERYNOVA_MODEL_SUMMARY", TEXT_MODEL),
+    "synthesis": os.getenv("QUERYNOVA_MODEL_SYNTHESIS", TEXT_MODEL),
+}
+# Model handles kept per process, keyed by (model, temperature, max_tokens).
+_MODEL_POOL_SIZE = 32
+
+# Gemini's batchEmbedContents accepts at most 100 contents per request.
+EMBED_BATCH_SIZE = 100
+
+# One budget per process, shared by ranking, summaries and query refinement.
+# Set an RPM/TPM value to 0 to disable that limit.
+_CONCURRENCY = int(os.getenv("QUERYNOVA_AI_CONCURRENCY", "4"))
+_REQUESTS_PER_MINUTE = float(os.getenv("QUERYNOVA_AI_RPM", "60"))
+_TOKENS_PER_MINUTE = float(os.getenv("QUERYNOVA_AI_TPM", "32000"))
+_THROTTLE_RETRIES = int(os.getenv("QUERYNOVA_AI_THROTTLE_RETRIES", "4"))
+# Completions sampled above this temperature are only cached when the caller
+# passes ``cache=True``; below it they are cached unless ``cache=False``.
+_CACHE_MAX_TEMPERATURE = float(os.getenv("QUERYNOVA_LLM_CACHE_MAX_TEMPERATURE", "0.5"))
+
+limiter = ProviderLimiter(_CONCURRENCY, _REQUESTS_PER_MINUTE, _TOKENS_PER_MINUTE)
+
 
 class AIProvider:
     """Google Gemini AI provider for embeddings and text generation."""
@@ -15,6 +52,9 @@ class AIProvider:
     def __init__(self):
         self.provider = None
         self.client = None
+        self._models: "OrderedDict[Tuple[str, float, int], Any]" = OrderedDict()
+        self._models_pid = os.getpid()
+        self._models_lock = threading.Lock()
         self._initialize()
     
     def _initialize(self):
@@ -33,49 +73,200 @@ class AIProvider:
         
         logger.warning("No Gemini API key configured. AI features will be limited.")
     
-    def get_embedding(self, text: str) -> Optional[List[float]]:
+    def get_embedding(self, text: str, task_type: str = DEFAULT_EMBEDDING_TASK) -> Optional[List[float]]:
         """Get text embedding from Gemini."""
         if not self.client:
             return None
         
         try:
-            result = self.client.embed_content(
-                model="models/embedding-001",
-                content=text,
-                task_type="retrieval_document"
-            )
-            return result['embedding']
-        
+            return self._call(lambda: self._embed(text, task_type), estimate_tokens(text))
+        except Exception as e:
+            logger.error(f"Embedding failed with Gemini: {e}")
+            return None
+
+    async def get_embedding_async(self, text: str, task_type: str = DEFAULT_EMBEDDING_TASK) -> Optional[List[float]]:
+        """Async variant of :meth:`get_embedding` sharing the same rate budget."""
+        if not self.client:
+            return None
+
+        try:
+            return await self._call_async(lambda: self._embed(text, task_type), estimate_tokens(text))
         except Exception as e:
             logger.error(f"Embedding failed with Gemini: {e}")
             return None
     
+    def get_embeddings(
+        self,
+        texts: Sequence[str],
+        task_type: str = DEFAULT_EMBEDDING_TASK,
+    ) -> List[Optional[List[float]]]:
+        """Embed many texts with as few provider calls as the batch limit allows.
+
+        Returns one entry per input; entries are ``None`` for chunks that failed.
+        """
+        if not self.client:
+            return [None] * len(texts)
+
+        embeddings: List[Optional[List[float]]] = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            chunk = list(texts[start:start + EMBED_BATCH_SIZE])
+            try:
+                vectors = self._call(
+                    lambda: self._embed(chunk, task_type),
+                    sum(estimate_tokens(text) for text in chunk),
+                )
+                if len(vectors) != len(chunk):
+                    raise ValueError(f"expected {len(chunk)} embeddings, got {len(vectors)}")
+                embeddings.extend(vectors)
+            except Exception as e:
+                logger.error(f"Batch embedding failed with Gemini: {e}")
+                embeddings.extend([None] * len(chunk))
+        return embeddings
+    
     def generate_text(
         self, 
         prompt: str, 
         system_prompt: Optional[str] = None,
         max_tokens: int = 400,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        cache: Optional[bool] = None,
+        task: Optional[str] = None,
+        model: Optional[str] = None,
     ) -> Optional[str]:
-        """Generate text completion using Gemini."""
+        """Generate text completion using Gemini.
+
+        ``model`` defaults to the model configured for ``task`` (see
+        :func:`model_for_task`). Completions are served from and saved to the
+        persistent response cache when ``cache`` is true, or when it is
+        ``None`` and ``temperature`` is at most
+        ``QUERYNOVA_LLM_CACHE_MAX_TEMPERATURE``.
+        """
         if not self.client:
             return None
         
+        model_name = model or model_for_task(task)
+        key = _response_cache_key(model_name, prompt, system_prompt, max_tokens, temperature, cache)
+        cached = _cache_lookup(key)
+        if cached is not None:
+            return cached
+
+        full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
         try:
-            model = self.client.GenerativeModel('gemini-pro')
-            full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
-            response = model.generate_content(
-                full_prompt,
-                generation_config={
-                    'temperature': temperature,
-                    'max_output_tokens': max_tokens,
-                }
+            text = self._call(
+                lambda: self._generate(model_name, full_prompt, max_tokens, temperature),
+                estimate_tokens(full_prompt) + max_tokens,
+            )
+        except Exception as e:
+            logger.error(f"Text generation failed with Gemini: {e}")
+            return None
+        _cache_store(key, model_name, text)
+        return text
+
+    async def generate_text_async(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 400,
+        temperature: float = 0.7,
+        cache: Optional[bool] = None,
+        task: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Optional[str]:
+        """Async variant of :meth:`generate_text` sharing the same rate budget and cache."""
+        if not self.client:
+            return None
+
+        model_name = model or model_for_task(task)
+        key = _response_cache_key(model_name, prompt, system_prompt, max_tokens, temperature, cache)
+        cached = await asyncio.to_thread(_cache_lookup, key)
+        if cached is not None:
+            return cached
+
+        full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+        try:
+            text = await self._call_async(
+                lambda: self._generate(model_name, full_prompt, max_tokens, temperature),
+                estimate_tokens(full_prompt) + max_tokens,
             )
-            return response.text
-        
         except Exception as e:
             logger.error(f"Text generation failed with Gemini: {e}")
             return None
+        await asyncio.to_thread(_cache_store, key, model_name, text)
+        return text
+
+    def _embed(self, content: Any, task_type: str) -> Any:
+        result = self.client.embed_content(
+            model=EMBEDDING_MODEL,
+            content=content,
+            task_type=task_type
+        )
+        return result['embedding']
+
+    def _generate(self, model_name: str, full_prompt: str, max_tokens: int, temperature: float) -> str:
+        response = self._model(model_name, max_tokens, temperature).generate_content(full_prompt)
+        return response.text
+
+    def _model(self, model_name: str, max_tokens: int, temperature: float) -> Any:
+        """Return a pooled ``GenerativeModel`` for this model and generation config.
+
+        Handles are created once and reused instead of being rebuilt on every
+        call. The pool is dropped in forked children (e.g. Celery prefork
+        workers) so they never share a parent's client connections.
+        """
+        key = (model_name, float(temperature), int(max_tokens))
+        with self._models_lock:
+            if self._models_pid != os.getpid():
+                self._models.clear()
+                self._models_pid = os.getpid()
+            handle = self._models.get(key)
+            if handle is not None:
+                self._models.move_to_end(key)
+                return handle
+        handle = self.client.GenerativeModel(
+            model_name,
+            generation_config={
+                'temperature': temperature,
+                'max_output_tokens': max_tokens,
+            }
+        )
+        with self._models_lock:
+            handle = self._models.setdefault(key, handle)
+            while len(self._models) > _MODEL_POOL_SIZE:
+                self._models.popitem(last=False)
+        return handle
+
+    def _call(self, fn: Callable[[], T], tokens: int) -> T:
+        """Run ``fn`` on the provider pool within the shared RPM/TPM budget.
+
+        Throttling errors are retried with jittered backoff that also pauses
+        other callers; anything else propagates immediately.
+        """
+        attempt = 0
+        while True:
+            time.sleep(limiter.reserve(tokens))
+            try:
+                return limiter.executor.submit(fn).result()
+            except Exception as exc:
+                if attempt >= _THROTTLE_RETRIES or not is_throttled(exc):
+                    raise
+                delay = limiter.backoff(attempt)
+                attempt += 1
+                logger.warning(f"Gemini throttled the request; retrying in {delay:.1f}s")
+
+    async def _call_async(self, fn: Callable[[], T], tokens: int) -> T:
+        """Async counterpart of :meth:`_call`; waits without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            await asyncio.sleep(limiter.reserve(tokens))
+            try:
+                return await loop.run_in_executor(limiter.executor, fn)
+            except Exception as exc:
+                if attempt >= _THROTTLE_RETRIES or not is_throttled(exc):
+                    raise
+                delay = limiter.backoff(attempt)
+                attempt += 1
+                logger.warning(f"Gemini throttled the request; retrying in {delay:.1f}s")
     
     def is_available(self) -> bool:
         """Check if any AI provider is available."""
@@ -86,6 +277,51 @@ class AIProvider:
         return self.provider or "none"
 
 
+def model_for_task(task: Optional[str]) -> str:
+    """Text model configured for ``task``, falling back to ``TEXT_MODEL``."""
+    if not task:
+        return TEXT_MODEL
+    return TASK_MODELS.get(task) or os.getenv(f"QUERYNOVA_MODEL_{task.upper()}") or TEXT_MODEL
+
+
+def set_task_model(task: str, model: str) -> None:
+    """Route text generation for ``task`` to ``model``."""
+    TASK_MODELS[task] = model
+
+
+def _response_cache_key(
+    model: str,
+    prompt: str,
+    system_prompt: Optional[str],
+    max_tokens: int,
+    temperature: float,
+    cache: Optional[bool],
+) -> Optional[str]:
+    """Cache key for a completion, or ``None`` when caching is bypassed."""
+    if cache is False or (cache is None and temperature > _CACHE_MAX_TEMPERATURE):
+        return None
+    return llm_cache.cache_key(model, system_prompt, prompt, temperature, max_tokens)
+
+
+def _cache_lookup(key: Optional[str]) -> Optional[str]:
+    if key is None:
+        return None
+    try:
+        return llm_cache.lookup(key)
+    except Exception as e:
+        logger.warning(f"LLM cache lookup failed: {e}")
+        return None
+
+
+def _cache_store(key: Optional[str], model: str, text: Optional[str]) -> None:
+    if key is None or not text:
+        return
+    try:
+        llm_cache.store(key, model, text)
+    except Exception as e:
+        logger.warning(f"LLM cache store failed: {e}")
+
+
 # Global singleton instance
 _ai_provider = None
 
@@ -96,3 +332,8 @@ def get_ai_provider() -> AIProvider:
     if _ai_provider is None:
         _ai_provider = AIProvider()
     return _ai_provider
+
+
+def shutdown(*_: Any, **__: Any) -> None:
+    """Stop the provider worker pool (safe to call more than once)."""
+    limiter.shutdown()
@@ -0,0 +1,120 @@
+"""Persistent embedding store keyed by model, task type and content hash."""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+_DB_PATH = os.getenv(
+    "QUERYNOVA_EMBED_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "embedding_cache.db"),
+)
+_MAX_ENTRIES = int(os.getenv("QUERYNOVA_EMBED_CACHE_MAX", "50000"))
+_LOCK = threading.Lock()
+_INITIALIZED = False
+_WHITESPACE_RE = re.compile(r"\s+")
+# SQLite limits the number of bound parameters per statement.
+_QUERY_CHUNK = 500
+
+
+def content_hash(text: str) -> str:
+    """Hash of the whitespace-normalized text, so trivial reflows share an entry."""
+    normalized = _WHITESPACE_RE.sub(" ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _ensure_db() -> None:
+    global _INITIALIZED
+    if _INITIALIZED:
+        return
+    os.makedirs(os.path.dirname(_DB_PATH), exist_ok=True)
+    with sqlite3.connect(_DB_PATH) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                task_type TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, task_type, content_hash)
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_embeddings_last_used
+            ON embeddings(last_used)
+            """
+        )
+        conn.commit()
+    _INITIALIZED = True
+
+
+@contextmanager
+def _connect() -> Iterable[sqlite3.Connection]:
+    with _LOCK:
+        _ensure_db()
+        conn = sqlite3.connect(_DB_PATH)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def lookup_many(model: str, task_type: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+    """Return cached float32 vectors aligned with ``texts`` (``None`` on miss)."""
+    hashes = [content_hash(text) for text in texts]
+    found = {}
+    now = time.time()
+    with _connect() as conn:
+        unique = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique), _QUERY_CHUNK):
+            chunk = unique[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT content_hash, vector FROM embeddings "
+                f"WHERE model = ? AND task_type = ? AND content_hash IN ({placeholders})",
+                (model, task_type, *chunk),
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        if found:
+            conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND task_type = ? AND content_hash = ?",
+                [(now, model, task_type, key) for key in found],
+            )
+            conn.commit()
+    return [found.get(key) for key in hashes]
+
+
+def store_many(model: str, task_type: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+    rows = []
+    now = time.time()
+    for text, vector in zip(texts, vectors):
+        if vector is None or not len(vector):
+            continue
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        rows.append((model, task_type, content_hash(text), blob, now))
+    if not rows:
+        return
+    with _connect() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, task_type, content_hash, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        (count,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count > _MAX_ENTRIES:
+            conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (count - _MAX_ENTRIES,),
+            )
+        conn.commit()
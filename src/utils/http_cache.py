@@ -0,0 +1,136 @@
+"""Persistent HTTP response cache storing validators for conditional GETs."""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+_DB_PATH = os.getenv(
+    "QUERYNOVA_HTTP_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "http_cache.db"),
+)
+_MAX_ENTRIES = int(os.getenv("QUERYNOVA_HTTP_CACHE_MAX", "10000"))
+_MAX_BYTES = int(os.getenv("QUERYNOVA_HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+_TTL = float(os.getenv("QUERYNOVA_HTTP_CACHE_TTL", str(30 * 24 * 3600)))
+_LOCK = threading.Lock()
+_INITIALIZED = False
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    page: Dict[str, Any]
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _ensure_db() -> None:
+    global _INITIALIZED
+    if _INITIALIZED:
+        return
+    os.makedirs(os.path.dirname(_DB_PATH), exist_ok=True)
+    with sqlite3.connect(_DB_PATH) as conn:
+        # Earlier versions kept every raw body, unbounded, in ``responses``.
+        conn.execute("DROP TABLE IF EXISTS responses")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                page TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_validators_last_used
+            ON validators(last_used)
+            """
+        )
+        conn.commit()
+    _INITIALIZED = True
+
+
+@contextmanager
+def _connect() -> Iterable[sqlite3.Connection]:
+    with _LOCK:
+        _ensure_db()
+        conn = sqlite3.connect(_DB_PATH)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def lookup(url: str) -> Optional[CachedResponse]:
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT etag, last_modified, page FROM validators WHERE url = ? AND last_used > ?",
+            (url, time.time() - _TTL),
+        ).fetchone()
+    if not row:
+        return None
+    etag, last_modified, page = row
+    return CachedResponse(
+        url=url,
+        etag=etag,
+        last_modified=last_modified,
+        page=json.loads(page),
+    )
+
+
+def store(url: str, etag: Optional[str], last_modified: Optional[str], page: Dict[str, Any]) -> None:
+    """Persist the validators and extracted page for ``url``.
+
+    Only responses carrying a validator are worth keeping. Rows unused for
+    ``QUERYNOVA_HTTP_CACHE_TTL`` seconds expire, and the least recently used
+    rows are evicted beyond ``QUERYNOVA_HTTP_CACHE_MAX`` entries or
+    ``QUERYNOVA_HTTP_CACHE_MAX_BYTES`` of page data.
+    """
+    if not etag and not last_modified:
+        return
+    payload = json.dumps(page)
+    now = time.time()
+    with _connect() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO validators (url, etag, last_modified, page, size, last_used)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (url, etag, last_modified, payload, len(payload), now),
+        )
+        conn.execute("DELETE FROM validators WHERE last_used <= ?", (now - _TTL,))
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM validators").fetchone()
+        if count > _MAX_ENTRIES or total > _MAX_BYTES:
+            evict = []
+            for rowid, size in conn.execute("SELECT rowid, size FROM validators ORDER BY last_used ASC"):
+                if count <= _MAX_ENTRIES and total <= _MAX_BYTES:
+                    break
+                evict.append((rowid,))
+                count -= 1
+                total -= size
+            conn.executemany("DELETE FROM validators WHERE rowid = ?", evict)
+        conn.commit()
+
+
+def touch(url: str) -> None:
+    """Record a successful revalidation."""
+    with _connect() as conn:
+        conn.execute("UPDATE validators SET last_used = ? WHERE url = ?", (time.time(), url))
+        conn.commit()
@@ -0,0 +1,135 @@
+"""Process-wide, long-lived HTTP client shared by the crawler."""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Awaitable, TypeVar
+
+import httpx
+
+from src.utils.logger import logger
+
+T = TypeVar("T")
+
+_MAX_CONNECTIONS = int(os.getenv("QUERYNOVA_HTTP_MAX_CONNECTIONS", "100"))
+_MAX_KEEPALIVE = int(os.getenv("QUERYNOVA_HTTP_MAX_KEEPALIVE", "20"))
+_KEEPALIVE_EXPIRY = float(os.getenv("QUERYNOVA_HTTP_KEEPALIVE_EXPIRY", "30"))
+_TIMEOUT = float(os.getenv("QUERYNOVA_HTTP_TIMEOUT", "15"))
+_HTTP2 = os.getenv("QUERYNOVA_HTTP2", "false").lower() in {"1", "true", "yes"}
+USER_AGENT = os.getenv("QUERYNOVA_USER_AGENT", "QueryNovaBot/2.0")
+
+# httpx connections are bound to the event loop that opened them, so one
+# client is kept per loop rather than a single global instance.
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_CLIENTS_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+def _http2_enabled() -> bool:
+    if not _HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("QUERYNOVA_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=_MAX_CONNECTIONS,
+        max_keepalive_connections=_MAX_KEEPALIVE,
+        keepalive_expiry=_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=_TIMEOUT,
+        limits=limits,
+        http2=_http2_enabled(),
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    with _CLIENTS_LOCK:
+        # A client references its loop, so entries for loops discarded by
+        # ``asyncio.run`` never leave the weak map on their own.
+        for stale in [other for other in _CLIENTS.keys() if other.is_closed()]:
+            _CLIENTS.pop(stale, None)
+        client = _CLIENTS.get(loop)
+        if client is None or client.is_closed:
+            client = _build_client()
+            _CLIENTS[loop] = client
+    return client
+
+
+async def aclose_client() -> None:
+    """Close the shared client bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+class _ThreadLoop:
+    """Owns a thread's ``run_sync`` loop and closes it when the thread exits.
+
+    Threads that are created per request (e.g. Streamlit script runs) would
+    otherwise leave their loop, client and keep-alive sockets behind.
+    """
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        weakref.finalize(self, _close_loop, self.loop)
+
+
+def _close_loop(loop: asyncio.AbstractEventLoop) -> None:
+    if loop.is_closed() or loop.is_running():
+        return
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.pop(loop, None)
+    if client is not None and not client.is_closed:
+        try:
+            loop.run_until_complete(client.aclose())
+        except Exception as exc:
+            logger.warning("Failed to close HTTP client: %s", exc)
+    loop.close()
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run ``coro`` on a persistent per-thread event loop.
+
+    ``asyncio.run`` creates and destroys a loop on every call, which discards
+    the loop-bound connection pool. Synchronous entry points (Flask views,
+    Celery tasks, Streamlit) should use this helper so repeat requests reuse
+    warm connections.
+    """
+    owner = getattr(_LOCAL, "owner", None)
+    if owner is None or owner.loop.is_closed():
+        owner = _ThreadLoop()
+        _LOCAL.owner = owner
+    return owner.loop.run_until_complete(coro)
+
+
+def shutdown(*_: Any, **__: Any) -> None:
+    """Close every idle shared client; safe to use as an atexit or signal hook."""
+    with _CLIENTS_LOCK:
+        items = list(_CLIENTS.items())
+        _CLIENTS.clear()
+    for loop, client in items:
+        if client.is_closed or loop.is_closed() or loop.is_running():
+            continue
+        try:
+            loop.run_until_complete(client.aclose())
+        except Exception as exc:
+            logger.warning("Failed to close HTTP client: %s", exc)
+    owner = getattr(_LOCAL, "owner", None)
+    if owner is not None:
+        _close_loop(owner.loop)
+        _LOCAL.owner = None
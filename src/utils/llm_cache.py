@@ -0,0 +1,98 @@
+"""Persistent store for LLM completions keyed by model, prompts and sampling settings."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+_DB_PATH = os.getenv(
+    "QUERYNOVA_LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "llm_cache.db"),
+)
+_TTL = float(os.getenv("QUERYNOVA_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+_MAX_ENTRIES = int(os.getenv("QUERYNOVA_LLM_CACHE_MAX", "5000"))
+_LOCK = threading.Lock()
+_INITIALIZED = False
+
+
+def cache_key(model: str, system_prompt: Optional[str], prompt: str, temperature: float, max_tokens: int) -> str:
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    payload = json.dumps([model, system_prompt or "", prompt_hash, round(float(temperature), 3), int(max_tokens)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _ensure_db() -> None:
+    global _INITIALIZED
+    if _INITIALIZED:
+        return
+    os.makedirs(os.path.dirname(_DB_PATH), exist_ok=True)
+    with sqlite3.connect(_DB_PATH) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_completions_last_used
+            ON completions(last_used)
+            """
+        )
+        conn.commit()
+    _INITIALIZED = True
+
+
+@contextmanager
+def _connect() -> Iterable[sqlite3.Connection]:
+    with _LOCK:
+        _ensure_db()
+        conn = sqlite3.connect(_DB_PATH)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def lookup(key: str) -> Optional[str]:
+    """Return the cached completion for ``key`` unless it is missing or expired."""
+    now = time.time()
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT response FROM completions WHERE key = ? AND created_at > ?",
+            (key, now - _TTL),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+        conn.commit()
+    return row[0]
+
+
+def store(key: str, model: str, response: str) -> None:
+    """Save a completion, dropping expired rows and the least recently used overflow."""
+    now = time.time()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO completions (key, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, model, response, now, now),
+        )
+        conn.execute("DELETE FROM completions WHERE created_at <= ?", (now - _TTL,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM completions").fetchone()
+        if count > _MAX_ENTRIES:
+            conn.execute(
+                "DELETE FROM completions WHERE rowid IN "
+                "(SELECT rowid FROM completions ORDER BY last_used ASC LIMIT ?)",
+                (count - _MAX_ENTRIES,),
+            )
+        conn.commit()
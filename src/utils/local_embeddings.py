@@ -0,0 +1,77 @@
+"""Offline embedding backend built on scikit-learn, for installs without a provider."""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.utils.logger import logger
+
+LOCAL_EMBEDDING_MODEL = "local-hashing-v1"
+_DIMENSIONS = int(os.getenv("QUERYNOVA_LOCAL_EMBEDDING_DIM", "384"))
+_HASH_FEATURES = 2 ** 18
+
+
+class LocalEmbedder:
+    """Hashing-vectorizer embeddings projected to a small dense space.
+
+    Word unigrams and bigrams are hashed into a sparse TF vector, then mapped
+    to ``dimensions`` dense components with a fixed sparse random projection,
+    which approximately preserves cosine similarity. Nothing is fitted on
+    data, so vectors are stable across processes and need no network or GPU.
+    """
+
+    def __init__(self, dimensions: int = _DIMENSIONS) -> None:
+        self.dimensions = dimensions
+        self.model_name = f"{LOCAL_EMBEDDING_MODEL}-{dimensions}"
+        self._vectorizer = None
+        self._projection = None
+        self._lock = threading.Lock()
+
+    def _ensure_ready(self) -> None:
+        if self._projection is not None:
+            return
+        with self._lock:
+            if self._projection is not None:
+                return
+            import scipy.sparse as sp
+            from sklearn.feature_extraction.text import HashingVectorizer
+            from sklearn.random_projection import SparseRandomProjection
+
+            self._vectorizer = HashingVectorizer(
+                n_features=_HASH_FEATURES,
+                ngram_range=(1, 2),
+                stop_words="english",
+                alternate_sign=False,
+                norm="l2",
+            )
+            projection = SparseRandomProjection(n_components=self.dimensions, dense_output=True, random_state=0)
+            projection.fit(sp.csr_matrix((1, _HASH_FEATURES)))
+            self._projection = projection
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a ``(len(texts), dimensions)`` float32 matrix."""
+        self._ensure_ready()
+        hashed = self._vectorizer.transform(list(texts))
+        return np.asarray(self._projection.transform(hashed), dtype=np.float32)
+
+
+_EMBEDDER: Optional[LocalEmbedder] = None
+_AVAILABLE: Optional[bool] = None
+
+
+def get_local_embedder() -> Optional[LocalEmbedder]:
+    """Return the shared embedder, or ``None`` when scikit-learn is not installed."""
+    global _EMBEDDER, _AVAILABLE
+    if _AVAILABLE is None:
+        try:
+            import sklearn  # noqa: F401
+        except ImportError:
+            logger.warning("scikit-learn is not installed; local embeddings are disabled")
+            _AVAILABLE = False
+        else:
+            _AVAILABLE = True
+            _EMBEDDER = LocalEmbedder()
+    return _EMBEDDER
@@ -0,0 +1,104 @@
+"""Bounded in-memory cache for crawled pages."""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+_DEFAULT_MAX_ENTRIES = int(os.getenv("QUERYNOVA_CRAWL_CACHE_MAX_ENTRIES", "512"))
+_DEFAULT_MAX_BYTES = int(os.getenv("QUERYNOVA_CRAWL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+_DEFAULT_TTL = float(os.getenv("QUERYNOVA_CRAWL_CACHE_TTL", "3600"))
+
+
+def estimate_page_size(page: Dict[str, Any]) -> int:
+    """Approximate the memory held by a page from its text, title and links."""
+    size = len(page.get("text") or "") + len(page.get("title") or "")
+    size += sum(len(link) for link in page.get("links") or [])
+    return size
+
+
+class PageCache:
+    """LRU cache with per-entry TTL and a byte budget.
+
+    Entries are evicted least-recently-used first whenever either the entry
+    count or the estimated byte total exceeds its limit. Expired entries are
+    dropped lazily on lookup.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        ttl: float = _DEFAULT_TTL,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, _, page = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def set(self, key: str, page: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        size = estimate_page_size(page)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, page)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,105 @@
+"""Process-wide request/token budgets for calls to the AI provider."""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` units a second.
+
+    :meth:`reserve` deducts immediately and returns how long the caller must
+    wait before its reservation is covered, so waiting works the same from
+    threads (``time.sleep``) and from any event loop (``asyncio.sleep``), and
+    callers are served in the order they reserved. ``per_minute <= 0``
+    disables the bucket.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        if self.rate <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+            self._updated = now
+            self._level -= amount
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+
+class ProviderLimiter:
+    """Shared concurrency, RPM and TPM budget plus throttling backoff.
+
+    Calls run on a dedicated pool of ``concurrency`` workers, which acts as
+    the shared semaphore for sync and async callers alike. When the provider
+    throttles, :meth:`backoff` pauses every caller, not just the one that was
+    rejected, so a burst does not turn into a retry storm.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 30.0,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="querynova-ai")
+            return self._executor
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request and ``tokens`` tokens; return the delay to wait."""
+        delay = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+        return max(delay, pause, 0.0)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential delay for retry ``attempt``; pauses all callers."""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def is_throttled(exc: BaseException) -> bool:
+    """Whether ``exc`` is a rate-limit / quota rejection from the provider."""
+    if type(exc).__name__ in {"ResourceExhausted", "TooManyRequests", "RateLimitError"}:
+        return True
+    if getattr(exc, "code", None) == 429 or getattr(exc, "status_code", None) == 429:
+        return True
+    return "429" in str(exc)
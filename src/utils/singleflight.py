@@ -0,0 +1,92 @@
+"""Coalesce concurrent calls for the same key into a single execution."""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """Set on the shared future when the leading caller was cancelled."""
+
+
+def _settle(shared: concurrent.futures.Future, result: object = None, exception: Optional[BaseException] = None) -> None:
+    if shared.done():
+        return
+    if exception is not None:
+        shared.set_exception(exception)
+    else:
+        shared.set_result(result)
+
+
+def _consume(waiter: "asyncio.Future") -> None:
+    # Followers that were cancelled never read the outcome; mark it retrieved.
+    if not waiter.cancelled():
+        waiter.exception()
+
+
+class SingleFlight:
+    """Run at most one in-flight call per key; later callers await its result.
+
+    Results are shared through ``concurrent.futures.Future`` so callers on
+    different threads and event loops (Flask threads, Celery tasks) coalesce
+    as well.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            with self._lock:
+                shared = self._calls.get(key)
+                if shared is None:
+                    shared = concurrent.futures.Future()
+                    self._calls[key] = shared
+                    self.executed += 1
+                    leader = True
+                else:
+                    self.coalesced += 1
+                    leader = False
+            if leader:
+                return await self._lead(key, shared, fn)
+            waiter = asyncio.wrap_future(shared)
+            waiter.add_done_callback(_consume)
+            try:
+                # Shielded so a cancelled follower never cancels the shared call;
+                # its own CancelledError still propagates.
+                return await asyncio.shield(waiter)
+            except _LeaderCancelled:
+                # The leader was cancelled rather than us: take over the call.
+                continue
+
+    async def _lead(self, key: Hashable, shared: concurrent.futures.Future, fn: Callable[[], Awaitable[T]]) -> T:
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            _settle(shared, exception=_LeaderCancelled())
+            raise
+        except BaseException as exc:
+            _settle(shared, exception=exc)
+            raise
+        else:
+            _settle(shared, result=result)
+            return result
+        finally:
+            with self._lock:
+                if self._calls.get(key) is shared:
+                    del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+            }
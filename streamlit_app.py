@@ -1,6 +1,5 @@
 ﻿from __future__ import annotations
 
-import asyncio
 import json
 import os
 import sys
@@ -17,6 +16,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 from src.services.knowledge_base import KnowledgeBase
 from src.services.search_service import SearchOptions, SearchPayload, SearchService
 from src.utils import cache
+from src.utils.http_client import run_sync
 from src.utils.logger import logger
 
 
@@ -203,18 +203,7 @@ def run_search(query: str, options: SearchOptions) -> Dict[str, Any]:
             st.toast(message)
 
     payload = SearchPayload(query=query, options=options)
-    try:
-        return asyncio.run(service.run(payload, progress=progress))
-    except RuntimeError as exc:
-        if "asyncio.run()" in str(exc):
-            loop = asyncio.new_event_loop()
-            try:
-                asyncio.set_event_loop(loop)
-                return loop.run_until_complete(service.run(payload, progress=progress))
-            finally:
-                asyncio.set_event_loop(None)
-                loop.close()
-        raise
+    return run_sync(service.run(payload, progress=progress))
 
 
 def ensure_state_and_theme() -> None: